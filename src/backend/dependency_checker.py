@@ -1,6 +1,8 @@
 """
 Checks for all required system dependencies for The Wolf VM.
 """
+import os
+import grp
 import shutil
 import subprocess
 from utils.logger import logger
@@ -103,8 +105,15 @@ class DependencyChecker:
         """Check if user is in required groups"""
         missing_groups = []
         try:
-            result = subprocess.run(['id', '-Gn'], capture_output=True, text=True, check=True)
-            current_groups = result.stdout.strip().split()
+            # Same list as `id -Gn`, without forking a process
+            gids = set(os.getgroups()) | {os.getegid()}
+            current_groups = []
+            for gid in gids:
+                try:
+                    current_groups.append(grp.getgrgid(gid).gr_name)
+                except KeyError:
+                    # gid without a group entry (containers, sssd); `id -Gn` prints the number
+                    current_groups.append(str(gid))
             
             for group in REQUIRED_GROUPS:
                 if group not in current_groups:
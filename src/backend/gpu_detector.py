@@ -3,11 +3,13 @@ GPU Detection and IOMMU Group Analysis
 Automatically detects GPUs, identifies vendors, and prepares for passthrough
 """
 
+import os
 import re
 import subprocess
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
+from functools import cached_property
 from utils.logger import logger
 
 
@@ -25,6 +27,50 @@ VGA_CLASS_CODE = '0300'  # VGA compatible controller
 DISPLAY_CLASS_CODE = '0380'  # Display controller
 AUDIO_CLASS_CODE = '0403'  # Audio device (often paired with GPU)
 
+# sysfs view of the PCI bus, and where distributions ship the PCI ID database
+PCI_DEVICES_PATH = '/sys/bus/pci/devices'
+PCI_IDS_PATHS = ('/usr/share/hwdata/pci.ids', '/usr/share/misc/pci.ids', '/usr/share/pci.ids')
+
+
+def _read_sysfs_id(device_dir: str, attr: str) -> Optional[str]:
+    """Read a hex ID attribute (e.g. '0x10de') from a sysfs device dir, without the 0x"""
+    try:
+        with open(os.path.join(device_dir, attr)) as f:
+            return f.read().strip()[2:]
+    except OSError:
+        return None
+
+
+def _lookup_pci_names(ids: Set[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+    """
+    Resolve (vendor_id, device_id) pairs to names from the pci.ids database
+
+    Names are "<vendor> <device>" cut at the first " [", matching what the
+    lspci-based parser used to extract. Unknown IDs are left out.
+    """
+    vendors = {vendor_id for vendor_id, _ in ids}
+    names: Dict[Tuple[str, str], str] = {}
+    for ids_path in PCI_IDS_PATHS:
+        try:
+            f = open(ids_path, encoding='utf-8', errors='replace')
+        except OSError:
+            continue
+        with f:
+            vendor_id = vendor_name = None
+            for line in f:
+                if line.startswith('C '):
+                    break  # device classes follow; no more vendors
+                if not line.strip() or line[0] == '#':
+                    continue
+                if line[0] != '\t':
+                    vendor_id = line[:4]
+                    vendor_name = line[4:].strip() if vendor_id in vendors else None
+                elif vendor_name and line[1] != '\t' and (vendor_id, line[1:5]) in ids:
+                    full_name = f"{vendor_name} {line[5:].strip()}"
+                    names[(vendor_id, line[1:5])] = full_name.split(' [')[0]
+        break
+    return names
+
 
 @dataclass
 class PCIDevice:
@@ -36,7 +82,15 @@ class PCIDevice:
     vendor_name: str
     device_name: str
     iommu_group: Optional[int] = None
-    driver: Optional[str] = None
+    
+    @cached_property
+    def driver(self) -> Optional[str]:
+        """Current kernel driver, read from sysfs on first access"""
+        # /sys/bus/pci/devices/0000:01:00.0/driver -> .../drivers/vfio-pci
+        try:
+            return os.path.basename(os.readlink(f'{PCI_DEVICES_PATH}/{self.address}/driver'))
+        except OSError:
+            return None  # No driver bound (or device gone)
     
     @property
     def is_gpu(self) -> bool:
@@ -48,6 +102,14 @@ class PCIDevice:
         """Check if device is audio (often GPU HDMI audio)"""
         return self.class_code == AUDIO_CLASS_CODE
     
+    @cached_property
+    def address_parts(self) -> Tuple[str, str, str, str]:
+        """Split address into (domain, bus, slot, function) hex strings"""
+        # 0000:01:00.0 -> ('0000', '01', '00', '0')
+        domain, bus, slot_func = self.address.split(':')
+        slot, func = slot_func.split('.')
+        return domain, bus, slot, func
+
     @property
     def virsh_format(self) -> str:
         """Convert PCI address to virsh nodedev format"""
@@ -81,12 +143,18 @@ class GPU:
         """Get GPU + all related devices"""
         return [self.pci_device] + self.related_devices
 
+    @property
+    def all_address_parts(self) -> List[Tuple[str, str, str, str]]:
+        """Get split PCI addresses of GPU + all related devices, in all_devices order"""
+        return [self.pci_device.address_parts] + [dev.address_parts for dev in self.related_devices]
+
 
 class GPUDetector:
     """Detects and analyzes GPUs for passthrough"""
     
     def __init__(self):
         self.gpus: List[GPU] = []
+        self.sorted_gpus: List[GPU] = []  # Passthrough-capable first, primary last
         self.all_pci_devices: List[PCIDevice] = []
         self.iommu_enabled = False
         self._scan_system()
@@ -107,6 +175,12 @@ class GPUDetector:
         # Analyze passthrough capability
         self._analyze_passthrough_capability()
         
+        # Display order, computed once per scan
+        self.sorted_gpus = sorted(
+            self.gpus,
+            key=lambda gpu: (not gpu.can_passthrough, gpu.is_primary, gpu.pci_address)
+        )
+        
         logger.info(f"GPU detection complete: Found {len(self.gpus)} GPU(s)")
     
     def _check_iommu(self) -> bool:
@@ -127,6 +201,41 @@ class GPUDetector:
             return False
     
     def _scan_pci_devices(self):
+        """Scan all PCI devices from sysfs, falling back to lspci"""
+        try:
+            addresses = sorted(os.listdir(PCI_DEVICES_PATH))
+        except OSError:
+            self._scan_pci_devices_lspci()
+            return
+        
+        raw = []
+        for address in addresses:
+            device_dir = os.path.join(PCI_DEVICES_PATH, address)
+            vendor_id = _read_sysfs_id(device_dir, 'vendor')
+            device_id = _read_sysfs_id(device_dir, 'device')
+            class_id = _read_sysfs_id(device_dir, 'class')
+            if not (vendor_id and device_id and class_id):
+                continue
+            # class is 0xCCSSPP (class, subclass, prog-if); keep class+subclass
+            raw.append((address, vendor_id, device_id, class_id[:4]))
+        
+        names = _lookup_pci_names({(vendor_id, device_id) for _, vendor_id, device_id, _ in raw})
+        
+        for address, vendor_id, device_id, class_code in raw:
+            device = PCIDevice(
+                address=address,
+                vendor_id=vendor_id,
+                device_id=device_id,
+                class_code=class_code,
+                vendor_name=GPU_VENDORS.get(vendor_id, f"Vendor {vendor_id}"),
+                device_name=names.get((vendor_id, device_id), "Unknown Device")
+            )
+            device.iommu_group = self._get_iommu_group(address)
+            self.all_pci_devices.append(device)
+        
+        logger.debug(f"Scanned {len(self.all_pci_devices)} PCI devices")
+    
+    def _scan_pci_devices_lspci(self):
         """Scan all PCI devices using lspci"""
         try:
             # Run lspci with numeric IDs and verbose output
@@ -143,8 +252,6 @@ class GPUDetector:
                 if device:
                     # Add IOMMU group info
                     device.iommu_group = self._get_iommu_group(device.address)
-                    # Add driver info
-                    device.driver = self._get_device_driver(device.address)
                     self.all_pci_devices.append(device)
             
             logger.debug(f"Scanned {len(self.all_pci_devices)} PCI devices")
@@ -211,20 +318,6 @@ class GPUDetector:
         
         return None
     
-    def _get_device_driver(self, pci_address: str) -> Optional[str]:
-        """Get current driver for a PCI device"""
-        try:
-            driver_path = Path(f'/sys/bus/pci/devices/{pci_address}/driver')
-            
-            if driver_path.exists() and driver_path.is_symlink():
-                # Read symlink to get driver name
-                driver_name = driver_path.resolve().name
-                return driver_name
-        except Exception as e:
-            logger.debug(f"Could not get driver for {pci_address}: {e}")
-        
-        return None
-    
     def _detect_gpus(self):
         """Detect all GPUs from scanned PCI devices"""
         gpu_devices = [dev for dev in self.all_pci_devices if dev.is_gpu]
@@ -264,11 +357,8 @@ class GPUDetector:
             
             # Same IOMMU group and nearby PCI address suggests related device
             if dev.iommu_group == gpu_device.iommu_group:
-                # Check if same bus (first 3 parts of address match)
-                gpu_bus = ':'.join(gpu_device.address.split(':')[:2])
-                dev_bus = ':'.join(dev.address.split(':')[:2])
-                
-                if gpu_bus == dev_bus:
+                # Check if same bus (domain and bus of address match)
+                if dev.address_parts[:2] == gpu_device.address_parts[:2]:
                     related.append(dev)
                     logger.debug(f"Found related device: {dev.device_name} at {dev.address}")
         
@@ -0,0 +1,49 @@
+"""
+Process-wide GPUDetector cache
+Scanning walks sysfs and parses pci.ids (running lspci only as a fallback),
+so the result is shared between dialogs and only redone on request, after a
+GPU is rebound, or once it is older than the caller allows
+"""
+
+import threading
+import time
+from typing import Optional
+
+from backend.gpu_detector import GPUDetector
+
+
+_lock = threading.Lock()
+_detector: Optional[GPUDetector] = None
+_detected_at = 0.0  # time.monotonic() of the last scan
+
+
+def get_detector(force_refresh: bool = False, max_age: Optional[float] = None) -> GPUDetector:
+    """
+    Get the shared GPUDetector, scanning the system on first use
+
+    Args:
+        force_refresh: Rescan even if a cached detector exists
+        max_age: Rescan if the cached scan is older than this many seconds
+
+    Returns:
+        GPUDetector holding the latest scan results
+    """
+    global _detector, _detected_at
+    with _lock:
+        stale = max_age is not None and time.monotonic() - _detected_at >= max_age
+        if _detector is None or force_refresh or stale:
+            _detector = GPUDetector()
+            _detected_at = time.monotonic()
+        return _detector
+
+
+def refresh() -> GPUDetector:
+    """Rescan GPUs (e.g. after the user clicks Rescan) and return the new detector"""
+    return get_detector(force_refresh=True)
+
+
+def invalidate():
+    """Drop the cached scan (e.g. after a GPU was rebound), so the next get rescans"""
+    global _detector
+    with _lock:
+        _detector = None
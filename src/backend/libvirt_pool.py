@@ -0,0 +1,44 @@
+"""
+Process-wide LibvirtManager pool
+Opening a libvirt connection means a socket handshake, authentication and
+capability probes, so one manager per URI is shared and reused
+"""
+
+import atexit
+import threading
+from typing import Dict
+
+from backend.libvirt_manager import LibvirtManager
+import config
+
+
+_lock = threading.Lock()
+_managers: Dict[str, LibvirtManager] = {}
+
+
+def get_manager(uri: str = None) -> LibvirtManager:
+    """
+    Get the shared LibvirtManager for a URI, connecting on first use
+
+    Args:
+        uri: libvirt connection URI (default: qemu:///system)
+
+    Returns:
+        LibvirtManager; its connection property reconnects if the link dropped
+    """
+    uri = uri or config.DEFAULT_LIBVIRT_URI
+    with _lock:
+        manager = _managers.get(uri)
+        if manager is None:
+            manager = LibvirtManager(uri)
+            _managers[uri] = manager
+        return manager
+
+
+@atexit.register
+def _disconnect_all():
+    """Close pooled connections on interpreter exit"""
+    with _lock:
+        for manager in _managers.values():
+            manager.disconnect()
+        _managers.clear()
@@ -286,24 +286,14 @@ class VMViewerManager:
             
             logger.info("Launching Looking Glass client...")
             
-            # Get SPICE connection info for keyboard/mouse
-            spice_result = subprocess.run(
-                ['virsh', 'domdisplay', vm_name],
-                capture_output=True,
-                text=True
-            )
-            
-            spice_uri = spice_result.stdout.strip()
-            logger.info(f"SPICE URI: {spice_uri}")
-            
-            # Extract host and port from spice://127.0.0.1:5900
+            # Get SPICE connection info for keyboard/mouse from the domain XML
+            # (virsh domdisplay only runs if the port hasn't been filled in)
             spice_args = []
-            if spice_uri.startswith('spice://'):
-                spice_host_port = spice_uri.replace('spice://', '')
-                if ':' in spice_host_port:
-                    host, port = spice_host_port.split(':')
-                    spice_args = ['spice:host=' + host, 'spice:port=' + port]
-                    logger.info(f"Using SPICE: host={host}, port={port}")
+            display_info = self.get_vm_display_info(domain)
+            if display_info and display_info[0] == 'spice' and display_info[2]:
+                _, host, port = display_info
+                spice_args = [f'spice:host={host}', f'spice:port={port}']
+                logger.info(f"Using SPICE: host={host}, port={port}")
             
             # Build Looking Glass command with config file
             import os
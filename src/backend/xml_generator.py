@@ -9,84 +9,564 @@ PHASE 2.C REFACTOR: Added support for settings from HyperGlass dialog
 (VRAM, 3D Accel, TPM).
 """
 
-import uuid
-import subprocess
-from typing import List, Dict, Optional
+import os
+import re
+import fcntl
+import json
+import platform
+import functools
+import secrets
+import threading
+import tempfile
+import time
+from typing import Any, Callable, Iterable, List, Dict, Optional, Tuple
 from pathlib import Path
-from shutil import copy2
+from shutil import copyfileobj
+from concurrent.futures import ThreadPoolExecutor
 
 from backend.gpu_detector import GPU
 from utils.logger import logger
 import config
 
 
+# Random bytes for VM UUIDs are drawn in batches so that bulk VM creation
+# does not cost one getrandom() syscall per domain.
+_UUID_BATCH = 64
+_uuid_buf = bytearray()
+_uuid_lock = threading.Lock()
+
+
+def _next_uuid() -> str:
+    """Return a random (version 4) UUID string from the pooled buffer"""
+    global _uuid_buf
+    with _uuid_lock:
+        if len(_uuid_buf) < 16:
+            _uuid_buf = bytearray(secrets.token_bytes(16 * _UUID_BATCH))
+        raw = _uuid_buf[:16]
+        del _uuid_buf[:16]
+    # Stamp the RFC 4122 version (4) and variant bits, then format directly
+    # rather than going through a uuid.UUID object.
+    raw[6] = (raw[6] & 0x0F) | 0x40
+    raw[8] = (raw[8] & 0x3F) | 0x80
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _random_mac() -> str:
+    """Return a random MAC address in QEMU's locally administered 52:54:00 range"""
+    tail = os.urandom(3).hex()
+    return f"52:54:00:{tail[0:2]}:{tail[2:4]}:{tail[4:6]}"
+
+
+# Standard firmware directories and file names, in order of preference.
+# Every directory is searched for every name (directories x names).
+# Newer distros (e.g. Ubuntu 25.10) only ship the 4M images; Fedora and
+# Arch install edk2 builds under /usr/share/edk2*.
+_OVMF_DIRS = (
+    "/usr/share/OVMF",           # Debian/Ubuntu
+    "/usr/share/qemu",
+    "/usr/share/ovmf",
+    "/usr/share/edk2/ovmf",      # Fedora
+    "/usr/share/edk2/x64",       # Arch
+    "/usr/share/edk2-ovmf/x64",  # older Fedora/Arch packages
+)
+_OVMF_CODE_NAMES = ("OVMF_CODE.fd", "OVMF_CODE_4M.fd", "OVMF_CODE.4m.fd")
+_OVMF_VARS_NAMES = ("OVMF_VARS.fd", "OVMF_VARS_4M.fd", "OVMF_VARS.4m.fd")
+
+# Standard directories found missing on this host -> time.monotonic() of that
+# check. They are skipped for _FIRMWARE_CACHE_TTL, then looked at again, so a
+# firmware package installed while the app runs is still picked up.
+_missing_firmware_dirs: Dict[str, float] = {}
+
+
+def _scan_firmware_dirs(filenames: Tuple[str, ...]) -> Optional[str]:
+    """
+    Return the first firmware file found in the standard directories.
+
+    Each directory is listed once with os.scandir() and the candidates are
+    matched in memory, instead of stat()ing every directory/name pair.
+    """
+    now = time.monotonic()
+    for directory in _OVMF_DIRS:
+        missing_since = _missing_firmware_dirs.get(directory)
+        if missing_since is not None and now - missing_since < _FIRMWARE_CACHE_TTL:
+            continue
+        try:
+            with os.scandir(directory) as entries:
+                names = {entry.name for entry in entries}
+        except FileNotFoundError:
+            # Don't retry directories that don't exist for a while
+            _missing_firmware_dirs[directory] = now
+            continue
+        except OSError:
+            continue
+        _missing_firmware_dirs.pop(directory, None)
+        for name in filenames:
+            if name in names:
+                return os.path.join(directory, name)
+    return None
+
+
+# Firmware lookups are reused until the containing directory changes (e.g. a
+# package upgrade) or the entry is older than this many seconds.
+_FIRMWARE_CACHE_TTL = 60.0
+
+
+def _dir_mtime(path: str) -> Optional[int]:
+    """Return the mtime of the directory containing path, or None"""
+    try:
+        return os.stat(os.path.dirname(path)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _host_cache_key() -> str:
+    """Identify the kernel + distro release the persisted paths were found on"""
+    try:
+        release = platform.freedesktop_os_release()
+        distro = f"{release.get('ID', '')}-{release.get('VERSION_ID', '')}"
+    except OSError:
+        distro = "unknown"
+    return f"{os.uname().release}/{distro}"
+
+
+def _read_persisted_firmware() -> Dict[str, Dict[str, str]]:
+    try:
+        return json.loads(config.OVMF_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _persist_firmware(name: str, path: Optional[str]):
+    """Store (or forget, if path is None) a discovered firmware path on disk"""
+    key = _host_cache_key()
+    paths = _read_persisted_firmware().get(key, {})
+    if path:
+        paths[name] = path
+    else:
+        paths.pop(name, None)
+    try:
+        config.OVMF_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        # Only the current host key is kept; entries for old kernels are dropped
+        config.OVMF_CACHE_FILE.write_text(json.dumps({key: paths}))
+    except OSError as e:
+        logger.debug(f"Failed to persist OVMF path cache: {e}")
+
+
+def _firmware_cache(finder: Callable[[], Optional[str]]) -> Callable[[], Optional[str]]:
+    """
+    Memoize a firmware lookup across XMLGenerator instances and launches.
+
+    Unlike lru_cache, the result is revalidated with a single stat of its
+    directory so long-running sessions pick up firmware package upgrades.
+    The first lookup of a process reuses the path persisted by a previous
+    run on the same kernel/distro, if it still exists.
+    Misses are never cached. The wrapper exposes cache_clear().
+
+    The path is only logged and written to disk when it changes, so the
+    periodic revalidation is silent and does no writes.
+    """
+    entry: Optional[Tuple[str, float, Optional[int]]] = None  # (path, checked_at, dir_mtime)
+    use_persisted = True  # Persisted file not read yet (its content is unknown)
+    persisted: Optional[str] = None  # Path currently stored on disk for this finder
+    lock = threading.Lock()
+
+    @functools.wraps(finder)
+    def wrapper() -> Optional[str]:
+        nonlocal entry, use_persisted, persisted
+        with lock:
+            now = time.monotonic()
+            previous = None
+            if entry is not None:
+                previous, checked_at, mtime = entry
+                if now - checked_at < _FIRMWARE_CACHE_TTL and _dir_mtime(previous) == mtime:
+                    return previous
+
+            path = None
+            if use_persisted:
+                use_persisted = False
+                persisted = _read_persisted_firmware().get(_host_cache_key(), {}).get(finder.__name__)
+                path = persisted
+                if path and not os.access(path, os.F_OK):
+                    path = None
+            if not path:
+                path = finder()
+                if path and path != persisted:
+                    _persist_firmware(finder.__name__, path)
+                    persisted = path
+
+            if path and path != previous:
+                logger.info(f"Using OVMF firmware: {path}")
+            entry = (path, now, _dir_mtime(path)) if path else None
+            return path
+
+    def cache_clear() -> None:
+        nonlocal entry, use_persisted, persisted
+        with lock:
+            entry = None
+            # Only touch the file if it may hold a path for this finder
+            if use_persisted or persisted is not None:
+                _persist_firmware(finder.__name__, None)
+            use_persisted = False
+            persisted = None
+
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+
+# <loader><value>...</value> entries of the domain capabilities naming OVMF CODE images
+_LOADER_VALUE_RE = re.compile(r'<value>([^<]*OVMF_CODE[^<]*)</value>')
+
+
+@_firmware_cache
+def _find_ovmf_code_path() -> Optional[str]:
+    """Find OVMF CODE firmware path on system (cached, see _firmware_cache)"""
+    path = _scan_firmware_dirs(_OVMF_CODE_NAMES)
+    if path:
+        logger.debug(f"Found OVMF CODE firmware: {path}")
+        return path
+
+    # Fallback - ask libvirt which firmware it knows about (no virsh fork)
+    try:
+        import libvirt  # Imported lazily; only needed on this rare path
+        conn = libvirt.openReadOnly(config.DEFAULT_LIBVIRT_URI)
+        try:
+            capabilities = conn.getDomainCapabilities(None, None, 'q35', None)
+        finally:
+            conn.close()
+
+        for match in _LOADER_VALUE_RE.finditer(capabilities):
+            path_str = match.group(1).strip()
+            if os.access(path_str, os.F_OK):
+                logger.debug(f"Auto-detected OVMF CODE: {path_str}")
+                return path_str
+    except Exception as e:
+        logger.debug(f"Failed to auto-detect OVMF CODE: {e}")
+
+    logger.warning("OVMF CODE firmware not found; VM launch may fail.")
+    return None
+
+
+@_firmware_cache
+def _find_ovmf_vars_path() -> Optional[str]:
+    """Find OVMF VARS template firmware path on system (cached, see _firmware_cache)"""
+    path = _scan_firmware_dirs(_OVMF_VARS_NAMES)
+    if path:
+        logger.debug(f"Found OVMF VARS template: {path}")
+        return path
+
+    logger.warning("OVMF VARS template firmware not found; VM launch may fail.")
+    return None
+
+
+_NVRAM_DIR = Path("/var/lib/libvirt/qemu/nvram/")
+
+_FICLONE = 0x40049409  # from linux/fs.h
+
+
+def _copy_nvram_template(template: str, target: Path):
+    """
+    Copy the OVMF VARS template for a new VM.
+
+    On copy-on-write filesystems (btrfs, XFS) the file is reflinked, which
+    shares the blocks instead of copying them; elsewhere this falls back
+    to a plain content copy.
+
+    The data goes to a temporary file in the target directory that is only
+    renamed into place once complete, so a failed or interrupted copy never
+    leaves a truncated NVRAM file behind to be reused later.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with open(template, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+            os.fchmod(dst.fileno(), 0o644)  # mkstemp creates the file 0600
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            except OSError:
+                copyfileobj(src, dst)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _cpu_topology(vcpus: int) -> Dict[str, int]:
+    """Simple topology: 1 socket, vcpus/2 cores, 2 threads"""
+    if vcpus % 2 == 0 and vcpus >= 2:
+        return {"sockets": 1, "cores": vcpus // 2, "threads": 2}
+    return {"sockets": 1, "cores": vcpus, "threads": 1}
+
+
+# Topologies for every vCPU count the UI can request, indexed by vcpus
+_CPU_TOPOLOGY = tuple(_cpu_topology(vcpus) for vcpus in range(129))
+
+
+# PCI passthrough device, placed on the dedicated guest bus 0x06. That bus
+# sits behind a pcie-root-port, which only exposes slot 0, so the devices
+# of one GPU become functions of a single multi-function guest device.
+_HOSTDEV_XML_TEMPLATE = """
+    <hostdev mode='subsystem' type='pci' managed='yes'>
+      <source>
+        <address domain='0x{domain}' bus='0x{bus}' slot='0x{slot}' function='0x{func}'/>
+      </source>
+      <address type='pci' domain='0x0000' bus='0x06' slot='0x00' function='0x{guest_function:x}'{multifunction}/>
+    </hostdev>"""
+
+
+# SPICE display with its QXL adapter (primary unless a GPU is passed through)
+_QXL_GRAPHICS_XML_TEMPLATE = """
+    <graphics type='spice' autoport='yes'>
+      <listen type='address'/>
+      <image compression='off'/>
+    </graphics>
+    <audio id='1' type='spice'/>
+    <video>
+      <model type='qxl' ram='{vram_kb}' vram='{vram_kb}' vgamem='16384' heads='1'{primary_attr}/>
+      <address type='pci' domain='0x0000' bus='0x00' slot='0x01' function='0x0'/>
+    </video>"""
+
+# --- PHASE 2.C: VirtIO-VGA adapter, optionally 3D accelerated ---
+_VIRTIO_GPU_ACCEL_XML = """
+        <acceleration accel3d='yes'/>"""
+
+_VIRTIO_GPU_XML_TEMPLATE = """
+    <video>
+      <model type='virtio' vram='{vram_kb}' heads='1'>{accel}
+      </model>
+      <address type='pci' domain='0x0000' bus='0x09' slot='0x00' function='0x0'/>
+    </video>"""
+
+
+# --- Static domain sections ---
+# These never depend on the VM being created, so they are rendered once at
+# import time instead of being rebuilt on every generate call.
+
+_FEATURES_XML = """\
+  <features>
+    <acpi/>
+    <apic/>
+    <hyperv>
+      <relaxed state='on'/>
+      <vapic state='on'/>
+      <spinlocks state='on' retries='8191'/>
+      <vpindex state='on'/>
+      <runtime state='on'/>
+      <synic state='on'/>
+      <stimer state='on'/>
+      <reset state='on'/>
+      <vendor_id state='on' value='1234567890ab'/>
+      <frequencies state='on'/>
+    </hyperv>
+    <kvm>
+      <hidden state='on'/>
+    </kvm>
+    <vmport state='off'/>
+    <ioapic driver='kvm'/>
+  </features>"""
+
+_CLOCK_XML = """\
+  <clock offset='localtime'>
+    <timer name='rtc' tickpolicy='catchup'/>
+    <timer name='pit' tickpolicy='delay'/>
+    <timer name='hpet' present='no'/>
+    <timer name='hypervclock' present='yes'/>
+  </clock>"""
+
+_POWER_MANAGEMENT_XML = """\
+  <on_poweroff>destroy</on_poweroff>
+  <on_reboot>restart</on_reboot>
+  <on_crash>destroy</on_crash>"""
+
+_DEVICES_HEADER_XML = """\
+  <devices>
+    <emulator>/usr/bin/qemu-system-x86_64</emulator>
+    <controller type='sata' index='0'>
+      <address type='pci' domain='0x0000' bus='0x00' slot='0x1f' function='0x2'/>
+    </controller>
+    <controller type='pci' index='0' model='pcie-root'/>
+    <controller type='pci' index='1' model='pcie-root-port'>
+      <address type='pci' domain='0x0000' bus='0x00' slot='0x02' function='0x0'/>
+    </controller>
+    <controller type='pci' index='2' model='pcie-root-port'>
+      <address type='pci' domain='0x0000' bus='0x00' slot='0x03' function='0x0'/>
+    </controller>
+    <controller type='pci' index='3' model='pcie-root-port'>
+      <address type='pci' domain='0x0000' bus='0x00' slot='0x04' function='0x0'/>
+    </controller>
+    <controller type='pci' index='4' model='pcie-root-port'>
+      <address type='pci' domain='0x0000' bus='0x00' slot='0x05' function='0x0'/>
+    </controller>
+    <controller type='pci' index='5' model='pcie-root-port'>
+      <address type='pci' domain='0x0000' bus='0x00' slot='0x06' function='0x0'/>
+    </controller>
+    <controller type='pci' index='6' model='pcie-root-port'>
+      <address type='pci' domain='0x0000' bus='0x00' slot='0x07' function='0x0'/>
+    </controller>
+    <controller type='pci' index='7' model='pcie-root-port'>
+      <address type='pci' domain='0x0000' bus='0x00' slot='0x08' function='0x0'/>
+    </controller>
+    <controller type='pci' index='8' model='pcie-root-port'>
+      <address type='pci' domain='0x0000' bus='0x00' slot='0x09' function='0x0'/>
+    </controller>
+    <controller type='virtio-serial' index='0'>
+      <address type='pci' domain='0x0000' bus='0x02' slot='0x00' function='0x0'/>
+    </controller>"""
+
+_NETWORK_XML = """
+    <interface type='network'>
+      <mac address='{mac}'/>
+      <source network='default'/>
+      <model type='virtio'/>
+      <address type='pci' domain='0x0000' bus='0x01' slot='0x00' function='0x0'/>
+    </interface>"""
+
+# --- PHASE 0 REFACTOR (Task 0.2) ---
+# IVSHMEM device required for Looking Glass
+_LOOKING_GLASS_SHMEM_XML = """
+    <shmem name='looking-glass'>
+      <model type='ivshmem-plain'/>
+      <size unit='M'>64</size>
+      <address type='pci' domain='0x0000' bus='0x04' slot='0x01' function='0x0'/>
+    </shmem>"""
+# --- END REFACTOR ---
+
+# Console, serial, and QEMU agent channels
+_CONSOLE_XML = """\
+    <serial type='pty'>
+      <target type='isa-serial' port='0'>
+        <model name='isa-serial'/>
+      </target>
+    </serial>
+    <console type='pty'>
+      <target type='serial' port='0'/>
+    </console>
+    <channel type='spicevmc'>
+      <target type='virtio' name='com.redhat.spice.0'/>
+      <address type='virtio-serial' controller='0' bus='0' port='1'/>
+    </channel>
+    <channel type='unix'>
+      <target type='virtio' name='org.qemu.guest_agent.0'/>
+      <address type='virtio-serial' controller='0' bus='0' port='2'/>
+    </channel>"""
+
+# Input devices (tablet for SPICE)
+_INPUT_DEVICES_XML = """\
+    <input type='tablet' bus='usb'>
+      <address type='usb' bus='0' port='1'/>
+    </input>
+    <input type='mouse' bus='ps2'/>
+    <input type='keyboard' bus='ps2'/>"""
+
+# TPM device (for Windows 11)
+_TPM_XML = """
+    <tpm model='tpm-tis'>
+      <backend type='passthrough'>
+        <device path='/dev/tpm0'/>
+      </backend>
+      <address type='pci' domain='0x0000' bus='0x05' slot='0x00' function='0x0'/>
+    </tpm>"""
+
+# Other VirtIO devices (balloon, rng) and the end of the devices block
+_DEVICES_FOOTER_XML = """\
+    <memballoon model='virtio'>
+      <address type='pci' domain='0x0000' bus='0x07' slot='0x00' function='0x0'/>
+    </memballoon>
+    <rng model='virtio'>
+      <backend model='random'>/dev/urandom</backend>
+      <address type='pci' domain='0x0000' bus='0x08' slot='0x00' function='0x0'/>
+    </rng>
+  </devices>"""
+
+# The complete domain document. Static sections are inlined at import time,
+# so generating a VM is a single format_map() pass over per-VM fields.
+_DOMAIN_XML_TEMPLATE = f"""<domain type='kvm'>
+  <name>{{vm_name}}</name>
+  <uuid>{{vm_uuid}}</uuid>
+  <memory unit='MiB'>{{memory_mb}}</memory>
+  <currentMemory unit='MiB'>{{memory_mb}}</currentMemory>
+  <vcpu placement='static'>{{vcpus}}</vcpu>
+  <cpu mode='host-passthrough' check='partial'>
+    <topology sockets='{{sockets}}' cores='{{cores}}' threads='{{threads}}'/>
+  </cpu>
+  <os>
+    <type arch='x86_64' machine='pc-q35-5.2'>hvm</type>
+    <loader readonly='yes' type='pflash'>{{ovmf_code_path}}</loader>
+    <nvram>{{nvram_path}}</nvram>
+    <boot dev='hd'/>
+    <boot dev='cdrom'/>
+    <bootmenu enable='yes'/>
+  </os>
+{_FEATURES_XML}
+{_CLOCK_XML}
+{_POWER_MANAGEMENT_XML}
+{_DEVICES_HEADER_XML}
+    <disk type='file' device='disk'>
+      <driver name='qemu' type='qcow2' cache='writeback' discard='unmap'/>
+      <source file='{{disk_path}}'/>
+      <target dev='vda' bus='virtio'/>
+      <boot order='1'/>
+      <address type='pci' domain='0x0000' bus='0x03' slot='0x00' function='0x0'/>
+    </disk>
+    <disk type='file' device='cdrom'>
+      <driver name='qemu' type='raw'/>
+      <source file='{{iso_path}}'/>
+      <target dev='sda' bus='sata'/>
+      <readonly/>
+      <boot order='2'/>
+      <address type='drive' controller='0' bus='0' target='0' unit='0'/>
+    </disk>
+    <disk type='file' device='cdrom'>
+      <driver name='qemu' type='raw'/>
+      <source file='{{virtio_iso_path}}'/>
+      <target dev='sdb' bus='sata'/>
+      <readonly/>
+      <address type='drive' controller='0' bus='0' target='0' unit='1'/>
+    </disk>{_NETWORK_XML}
+{{display_devices}}
+{_CONSOLE_XML}
+{_INPUT_DEVICES_XML}{{tpm}}
+{_DEVICES_FOOTER_XML}
+</domain>"""
+
+
 class XMLGenerator:
     """Generate libvirt domain XML for Windows VMs"""
-    
+
+    # Set once the NVRAM directory is known to exist (shared by all instances)
+    _nvram_dir_ready: bool = False
+
     def __init__(self):
-        self.ovmf_code_path = self._find_ovmf_code_path()
+        self._resolve_ovmf_paths()
+
+    def refresh_ovmf_paths(self):
+        """
+        Re-discover OVMF firmware, e.g. after the package was reinstalled
+        or moved while the application is running.
+        """
+        _find_ovmf_code_path.cache_clear()
+        _find_ovmf_vars_path.cache_clear()
+        _missing_firmware_dirs.clear()
+        self._resolve_ovmf_paths()
+
+    def _resolve_ovmf_paths(self):
+        """Resolve and validate firmware paths (raises FileNotFoundError)"""
+        self.ovmf_code_path = _find_ovmf_code_path()
         if not self.ovmf_code_path:
             logger.error("Could not find any OVMF_CODE.fd file. VM creation will fail.")
             raise FileNotFoundError("OVMF_CODE.fd not found in any standard location.")
 
-        self.ovmf_vars_path = self._find_ovmf_vars_path()
+        self.ovmf_vars_path = _find_ovmf_vars_path()
         if not self.ovmf_vars_path:
             logger.error("Could not find any OVMF_VARS.fd file. VM creation will fail.")
             raise FileNotFoundError("OVMF_VARS.fd not found in any standard location.")
 
-
-    def _find_ovmf_code_path(self) -> Optional[str]:
-        """Find OVMF CODE firmware path on system"""
-        possible_paths = [
-            "/usr/share/OVMF/OVMF_CODE.fd",
-            "/usr/share/qemu/OVMF_CODE.fd",
-            "/usr/share/ovmf/OVMF_CODE.fd"
-        ]
-        
-        for path in possible_paths:
-            if Path(path).exists():
-                logger.info(f"Using OVMF CODE firmware: {path}")
-                return path
-        
-        # Fallback - use libvirt to detect
-        try:
-            result = subprocess.run(
-                ['virsh', 'domcapabilities', '--machine', 'q35'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                import xml.etree.ElementTree as ET
-                root = ET.fromstring(result.stdout)
-                
-                for loader in root.findall('.//loader/value'):
-                    path_str = loader.text
-                    if path_str and 'OVMF_CODE' in path_str and Path(path_str).exists():
-                        logger.info(f"Auto-detected OVMF CODE: {path_str}")
-                        return path_str
-        except Exception as e:
-            logger.debug(f"Failed to auto-detect OVMF CODE: {e}")
-        
-        logger.warning("OVMF CODE firmware not found; VM launch may fail.")
-        return None
-
-    def _find_ovmf_vars_path(self) -> Optional[str]:
-        """Find OVMF VARS template firmware path on system"""
-        possible_paths = [
-            "/usr/share/OVMF/OVMF_VARS.fd",
-            "/usr/share/qemu/OVMF_VARS.fd",
-            "/usr/share/ovmf/OVMF_VARS.fd"
-        ]
-        
-        for path in possible_paths:
-            if Path(path).exists():
-                logger.info(f"Using OVMF VARS template: {path}")
-                return path
-        
-        logger.warning("OVMF VARS template firmware not found; VM launch may fail.")
-        return None
+        # The firmware path is fixed for this generator, so bake it into a
+        # per-instance copy of the template (braces escaped for format_map).
+        escaped_code_path = self.ovmf_code_path.replace("{", "{{").replace("}", "}}")
+        self._skeleton = _DOMAIN_XML_TEMPLATE.replace("{ovmf_code_path}", escaped_code_path)
 
     def _prepare_ovmf_vars_file(self, vm_name: str) -> str:
         """
@@ -98,16 +578,18 @@ class XMLGenerator:
             logger.error("Cannot prepare OVMF VARS file: Template path is not set.")
             return "" # VM will fail to start, but this avoids a crash
 
-        # Store per-VM NVRAM files in a standard libvirt location
-        nvram_dir = Path("/var/lib/libvirt/qemu/nvram/")
-        nvram_dir.mkdir(parents=True, exist_ok=True)
-        
-        vm_nvram_path = nvram_dir / f"{vm_name}_VARS.fd"
-        
-        if not vm_nvram_path.exists():
+        # Store per-VM NVRAM files in a standard libvirt location.
+        # The directory only has to be created once per process.
+        if not XMLGenerator._nvram_dir_ready:
+            _NVRAM_DIR.mkdir(parents=True, exist_ok=True)
+            XMLGenerator._nvram_dir_ready = True
+
+        vm_nvram_path = _NVRAM_DIR / f"{vm_name}_VARS.fd"
+
+        if not os.access(vm_nvram_path, os.F_OK):
             try:
                 logger.info(f"Copying OVMF template to {vm_nvram_path}")
-                copy2(self.ovmf_vars_path, vm_nvram_path)
+                _copy_nvram_template(self.ovmf_vars_path, vm_nvram_path)
                 # TODO: Set correct permissions (chown libvirt-qemu)
             except Exception as e:
                 logger.error(f"Failed to copy OVMF VARS template: {e}")
@@ -116,167 +598,14 @@ class XMLGenerator:
         return str(vm_nvram_path)
 
     def _calculate_cpu_topology(self, vcpus: int) -> Dict[str, int]:
-        """Calculate CPU topology (sockets, cores, threads)"""
-        # Simple topology: 1 socket, vcpus/2 cores, 2 threads
-        if vcpus % 2 == 0 and vcpus >= 2:
-            cores = vcpus // 2
-            threads = 2
-        else:
-            cores = vcpus
-            threads = 1
-            
-        return {
-            "sockets": 1,
-            "cores": cores,
-            "threads": threads
-        }
-
-    def _generate_os_config(self, vm_name: str, nvram_path: str) -> str:
-        """Generate OS boot and firmware configuration"""
-        return f"""
-            <os>
-              <type arch='x86_64' machine='pc-q35-5.2'>hvm</type>
-              <loader readonly='yes' type='pflash'>{self.ovmf_code_path}</loader>
-              <nvram>{nvram_path}</nvram>
-              <boot dev='hd'/>
-              <boot dev='cdrom'/>
-              <bootmenu enable='yes'/>
-            </os>
-        """
-
-    def _generate_features(self) -> str:
-        """Generate CPU and Hyper-V features"""
-        return """
-            <features>
-              <acpi/>
-              <apic/>
-              <hyperv>
-                <relaxed state='on'/>
-                <vapic state='on'/>
-                <spinlocks state='on' retries='8191'/>
-                <vpindex state='on'/>
-                <runtime state='on'/>
-                <synic state='on'/>
-                <stimer state='on'/>
-                <reset state='on'/>
-                <vendor_id state='on' value='1234567890ab'/>
-                <frequencies state='on'/>
-              </hyperv>
-              <kvm>
-                <hidden state='on'/>
-              </kvm>
-              <vmport state='off'/>
-              <ioapic driver='kvm'/>
-            </features>
         """
+        Calculate CPU topology (sockets, cores, threads).
 
-    def _generate_cpu_config(self, topology: Dict[str, int]) -> str:
-        """Generate CPU configuration (host-passthrough)"""
-        return f"""
-            <cpu mode='host-passthrough' check='partial'>
-              <topology sockets='{topology["sockets"]}' cores='{topology["cores"]}' threads='{topology["threads"]}'/>
-            </cpu>
-        """
-
-    def _generate_clock_config(self) -> str:
-        """Generate clock and timer configuration"""
-        return """
-            <clock offset='localtime'>
-              <timer name='rtc' tickpolicy='catchup'/>
-              <timer name='pit' tickpolicy='delay'/>
-              <timer name='hpet' present='no'/>
-              <timer name='hypervclock' present='yes'/>
-            </clock>
-        """
-
-    def _generate_power_management(self) -> str:
-        """Generate power management configuration"""
-        return """
-            <on_poweroff>destroy</on_poweroff>
-            <on_reboot>restart</on_reboot>
-            <on_crash>destroy</on_crash>
-        """
-
-    def _generate_devices_header(self) -> str:
-        """Generate devices block header"""
-        return """
-            <devices>
-              <emulator>/usr/bin/qemu-system-x86_64</emulator>
-              <controller type='sata' index='0'>
-                <address type='pci' domain='0x0000' bus='0x00' slot='0x1f' function='0x2'/>
-              </controller>
-              <controller type='pci' index='0' model='pcie-root'/>
-              <controller type='pci' index='1' model='pcie-root-port'>
-                <address type='pci' domain='0x0000' bus='0x00' slot='0x02' function='0x0'/>
-              </controller>
-              <controller type='pci' index='2' model='pcie-root-port'>
-                <address type='pci' domain='0x0000' bus='0x00' slot='0x03' function='0x0'/>
-              </controller>
-              <controller type='pci' index='3' model='pcie-root-port'>
-                <address type='pci' domain='0x0000' bus='0x00' slot='0x04' function='0x0'/>
-              </controller>
-              <controller type='pci' index='4' model='pcie-root-port'>
-                <address type='pci' domain='0x0000' bus='0x00' slot='0x05' function='0x0'/>
-              </controller>
-              <controller type='pci' index='5' model='pcie-root-port'>
-                <address type='pci' domain='0x0000' bus='0x00' slot='0x06' function='0x0'/>
-              </controller>
-              <controller type='pci' index='6' model='pcie-root-port'>
-                <address type='pci' domain='0x0000' bus='0x00' slot='0x07' function='0x0'/>
-              </controller>
-              <controller type='pci' index='7' model='pcie-root-port'>
-                <address type='pci' domain='0x0000' bus='0x00' slot='0x08' function='0x0'/>
-              </controller>
-              <controller type='pci' index='8' model='pcie-root-port'>
-                <address type='pci' domain='0x0000' bus='0x00' slot='0x09' function='0x0'/>
-              </controller>
-              <controller type='virtio-serial' index='0'>
-                <address type='pci' domain='0x0000' bus='0x02' slot='0x00' function='0x0'/>
-              </controller>
-        """
-
-    def _generate_disk_config(self, disk_path: str) -> str:
-        """Generate main disk configuration (vda)"""
-        return f"""
-              <disk type='file' device='disk'>
-                <driver name='qemu' type='qcow2' cache='writeback' discard='unmap'/>
-                <source file='{disk_path}'/>
-                <target dev='vda' bus='virtio'/>
-                <boot order='1'/>
-                <address type='pci' domain='0x0000' bus='0x03' slot='0x00' function='0x0'/>
-              </disk>
-        """
-
-    def _generate_cdrom_config(self, iso_path: str, virtio_iso_path: str) -> str:
-        """Generate CD-ROM drives (Windows ISO and VirtIO ISO)"""
-        return f"""
-              <disk type='file' device='cdrom'>
-                <driver name='qemu' type='raw'/>
-                <source file='{iso_path}'/>
-                <target dev='sda' bus='sata'/>
-                <readonly/>
-                <boot order='2'/>
-                <address type='drive' controller='0' bus='0' target='0' unit='0'/>
-              </disk>
-              <disk type='file' device='cdrom'>
-                <driver name='qemu' type='raw'/>
-                <source file='{virtio_iso_path}'/>
-                <target dev='sdb' bus='sata'/>
-                <readonly/>
-                <address type='drive' controller='0' bus='0' target='0' unit='1'/>
-              </disk>
-        """
-
-    def _generate_network_config(self) -> str:
-        """Generate VirtIO network configuration"""
-        return """
-              <interface type='network'>
-                <mac address='52:54:00:00:00:01'/>
-                <source network='default'/>
-                <model type='virtio'/>
-                <address type='pci' domain='0x0000' bus='0x01' slot='0x00' function='0x0'/>
-              </interface>
+        The returned dict is shared; callers must not modify it.
         """
+        if 0 <= vcpus < len(_CPU_TOPOLOGY):
+            return _CPU_TOPOLOGY[vcpus]
+        return _cpu_topology(vcpus)
 
     # --- PHASE 0 REFACTOR (Task 0.3) ---
     # --- PHASE 2.C MOD: Added vram_mb ---
@@ -288,66 +617,34 @@ class XMLGenerator:
         """
         primary_attr = " primary='yes'" if is_primary else ""
         vram_kb = vram_mb * 1024 # Convert MB to KB for libvirt
-        
-        return f"""
-              <graphics type='spice' autoport='yes'>
-                <listen type='address'/>
-                <image compression='off'/>
-              </graphics>
-              <audio id='1' type='spice'/>
-              <video>
-                <model type='qxl' ram='{vram_kb}' vram='{vram_kb}' vgamem='16384' heads='1'{primary_attr}/>
-                <address type='pci' domain='0x0000' bus='0x00' slot='0x01' function='0x0'/>
-              </video>
-        """
+        return _QXL_GRAPHICS_XML_TEMPLATE.format(vram_kb=vram_kb, primary_attr=primary_attr)
     # --- END REFACTOR ---
 
     # --- PHASE 0 REFACTOR (Task 0.1) ---
-    def _generate_pci_hostdev(self, pci_address: str, bus_slot: int) -> str:
+    def _generate_gpu_hostdevs(self, gpu: GPU) -> str:
+        """Generate hostdev XML for the GPU and all its related devices"""
+        addresses = gpu.all_address_parts
+        multifunction = len(addresses) > 1
+        return "".join(
+            self._generate_pci_hostdev(address, guest_function=i,
+                                       multifunction=multifunction and i == 0)
+            for i, address in enumerate(addresses)
+        )
+
+    def _generate_pci_hostdev(self, address: Tuple[str, str, str, str], guest_function: int,
+                              multifunction: bool = False) -> str:
         """
         Generate PCI hostdev XML for GPU passthrough.
         Includes guest PCI address assignment logic merged from vm_gpu_configurator.
         """
-        try:
-            # Parse 0000:01:00.0 format
-            domain, bus, slot_func = pci_address.split(':')
-            slot, func = slot_func.split('.')
-            
-            domain_s = f"{int(domain, 16):04x}"
-            bus_s = f"{int(bus, 16):02x}"
-            slot_s = f"{int(slot, 16):02x}"
-            func_s = f"{int(func, 16):x}"
-
-            # Assign guest PCI address on a dedicated bus (e.g., bus 0x06)
-            # Use bus_slot to give each device a unique slot (0, 1, 2, etc.)
-            guest_bus = "0x06" 
-            guest_slot = f"0x{bus_slot:02x}"
-
-            return f"""
-              <hostdev mode='subsystem' type='pci' managed='yes'>
-                <source>
-                  <address domain='0x{domain_s}' bus='0x{bus_s}' slot='0x{slot_s}' function='0x{func_s}'/>
-                </source>
-                <address type='pci' domain='0x0000' bus='{guest_bus}' slot='{guest_slot}' function='0x0'/>
-              </hostdev>
-            """
-        except Exception as e:
-            logger.error(f"Failed to parse PCI address '{pci_address}': {e}")
-            return ""
-    # --- END REFACTOR ---
-
-    # --- PHASE 0 REFACTOR (Task 0.2) ---
-    def _generate_looking_glass_shmem(self) -> str:
-        """
-        Generates the IVSHMEM device required for Looking Glass.
-        """
-        return """
-              <shmem name='looking-glass'>
-                <model type='ivshmem-plain'/>
-                <size unit='M'>64</size>
-                <address type='pci' domain='0x0000' bus='0x04' slot='0x01' function='0x0'/>
-              </shmem>
-        """
+        # Assign guest PCI address on a dedicated bus (bus 0x06, slot 0).
+        # Each device of the GPU gets its own function (0, 1, 2, etc.)
+        domain, bus, slot, func = address
+        return _HOSTDEV_XML_TEMPLATE.format(
+            domain=domain, bus=bus, slot=slot, func=func,
+            guest_function=guest_function,
+            multifunction=" multifunction='on'" if multifunction else "",
+        )
     # --- END REFACTOR ---
 
     # --- PHASE 2.C REFACTOR: New method for 3D Accel ---
@@ -357,73 +654,10 @@ class XMLGenerator:
         This is separate from the QXL/SPICE device.
         """
         vram_kb = vram_mb * 1024
-        accel_str = "<acceleration accel3d='yes'/>" if accel_3d else ""
-        
-        return f"""
-              <video>
-                <model type='virtio' vram='{vram_kb}' heads='1'>
-                  {accel_str}
-                </model>
-                <address type='pci' domain='0x0000' bus='0x09' slot='0x00' function='0x0'/>
-              </video>
-        """
+        accel = _VIRTIO_GPU_ACCEL_XML if accel_3d else ""
+        return _VIRTIO_GPU_XML_TEMPLATE.format(vram_kb=vram_kb, accel=accel)
     # --- END PHASE 2.C ---
 
-    def _generate_console(self) -> str:
-        """Generate console, serial, and QEMU agent channels"""
-        return """
-              <serial type='pty'>
-                <target type='isa-serial' port='0'>
-                  <model name='isa-serial'/>
-                </target>
-              </serial>
-              <console type='pty'>
-                <target type='serial' port='0'/>
-              </console>
-              <channel type='spicevmc'>
-                <target type='virtio' name='com.redhat.spice.0'/>
-                <address type='virtio-serial' controller='0' bus='0' port='1'/>
-              </channel>
-              <channel type='unix'>
-                <target type='virtio' name='org.qemu.guest_agent.0'/>
-                <address type='virtio-serial' controller='0' bus='0' port='2'/>
-              </channel>
-        """
-
-    def _generate_input_devices(self) -> str:
-        """Generate input devices (tablet for SPICE)"""
-        return """
-              <input type='tablet' bus='usb'>
-                <address type='usb' bus='0' port='1'/>
-              </input>
-              <input type='mouse' bus='ps2'/>
-              <input type='keyboard' bus='ps2'/>
-        """
-
-    def _generate_tpm_device(self) -> str:
-        """Generate TPM device (for Windows 11)"""
-        return """
-              <tpm model='tpm-tis'>
-                <backend type='passthrough'>
-                  <device path='/dev/tpm0'/>
-                </backend>
-                <address type='pci' domain='0x0000' bus='0x05' slot='0x00' function='0x0'/>
-              </tpm>
-        """
-
-    def _generate_other_devices(self) -> str:
-        """Generate other VirtIO devices (balloon, rng)"""
-        return """
-              <memballoon model='virtio'>
-                <address type='pci' domain='0x0000' bus='0x07' slot='0x00' function='0x0'/>
-              </memballoon>
-              <rng model='virtio'>
-                <backend model='random'>/dev/urandom</backend>
-                <address type='pci' domain='0x0000' bus='0x08' slot='0x00' function='0x0'/>
-              </rng>
-            </devices>
-        """
-
     # --- PHASE 2.C MOD: Added settings dict ---
     def generate_windows_vm_xml(
         self,
@@ -441,6 +675,9 @@ class XMLGenerator:
     ) -> str:
         """
         Generate the complete libvirt XML for a new Windows VM.
+
+        The result is returned as str: libvirt-python's defineXML() only
+        accepts str, so the document is handed over without any encode step.
         """
         if settings is None:
             settings = {}
@@ -448,32 +685,12 @@ class XMLGenerator:
         if not self.ovmf_code_path or not self.ovmf_vars_path:
             raise FileNotFoundError("OVMF firmware (CODE or VARS) not found. Cannot generate VM.")
 
-        vm_uuid = str(uuid.uuid4())
+        vm_uuid = _next_uuid()
         topology = self._calculate_cpu_topology(vcpus)
         nvram_path = self._prepare_ovmf_vars_file(vm_name)
         if not nvram_path:
             raise RuntimeError(f"Failed to prepare NVRAM file for {vm_name}")
         
-        xml_parts = [
-            f"<domain type='kvm'>",
-            f"  <name>{vm_name}</name>",
-            f"  <uuid>{vm_uuid}</uuid>",
-            f"  <memory unit='MiB'>{memory_mb}</memory>",
-            f"  <currentMemory unit='MiB'>{memory_mb}</currentMemory>",
-            f"  <vcpu placement='static'>{vcpus}</vcpu>",
-            "    <cpu mode='host-passthrough' check='partial'>",
-            f"      <topology sockets='{topology['sockets']}' cores='{topology['cores']}' threads='{topology['threads']}'/>",
-            "    </cpu>",
-            self._generate_os_config(vm_name, nvram_path),
-            self._generate_features(),
-            self._generate_clock_config(),
-            self._generate_power_management(),
-            self._generate_devices_header(),
-            self._generate_disk_config(disk_path),
-            self._generate_cdrom_config(iso_path, virtio_iso_path),
-            self._generate_network_config(),
-        ]
-
         # --- PHASE 0 REFACTOR (Task 0.3) ---
         # Always include SPICE/QXL.
         # SPICE is required for Looking Glass input or basic install.
@@ -481,45 +698,58 @@ class XMLGenerator:
         is_primary_display = not enable_gpu_passthrough
         # --- PHASE 2.C MOD: Read VRAM for QXL ---
         vram = int(settings.get("vram", "128"))
-        xml_parts.append("    ")
-        xml_parts.append(self._generate_qxl_graphics(is_primary=is_primary_display, vram_mb=vram))
+        display_devices = self._generate_qxl_graphics(is_primary=is_primary_display, vram_mb=vram)
         # --- END REFACTOR ---
 
         # --- PHASE 2.C MOD: Add VirtIO GPU if 3D Accel is on ---
         if settings.get("3d_accel", "false").lower() == "true":
-            xml_parts.append("    ")
-            xml_parts.append(self._generate_virtio_gpu(vram_mb=vram, accel_3d=True))
+            display_devices += self._generate_virtio_gpu(vram_mb=vram, accel_3d=True)
         # --- END MOD ---
 
         if enable_gpu_passthrough and gpu:
-            xml_parts.append("    ")
             # --- PHASE 0 REFACTOR (Task 0.1) ---
-            # Enumerate devices to assign unique guest PCI slots
-            for i, device in enumerate(gpu.all_devices):
-                xml_parts.append(self._generate_pci_hostdev(device.address, bus_slot=i))
+            display_devices += self._generate_gpu_hostdevs(gpu)
             # --- END REFACTOR ---
-        
+
         # --- PHASE 0 REFACTOR (Task 0.2) ---
         # Add Looking Glass IVSHMEM device if selected
         if display_preference == "looking-glass":
-            xml_parts.append("    ")
-            xml_parts.append(self._generate_looking_glass_shmem())
+            display_devices += _LOOKING_GLASS_SHMEM_XML
         # --- END REFACTOR ---
 
-        xml_parts.extend([
-            self._generate_console(),
-            self._generate_input_devices(),
-        ])
-
         # --- PHASE 2.C MOD: Check setting OR param for TPM ---
         tpm_enabled_setting = settings.get("tpm_enabled", "false").lower() == "true"
-        if enable_tpm or tpm_enabled_setting:
-            xml_parts.append(self._generate_tpm_device())
+        tpm = _TPM_XML if (enable_tpm or tpm_enabled_setting) else ""
         # --- END MOD ---
-            
-        xml_parts.extend([
-            self._generate_other_devices(),
-            "</domain>"
-        ])
-        
-        return "\n".join(xml_parts)
\ No newline at end of file
+
+        return self._skeleton.format_map({
+            "vm_name": vm_name,
+            "vm_uuid": vm_uuid,
+            "memory_mb": memory_mb,
+            "vcpus": vcpus,
+            **topology,
+            "nvram_path": nvram_path,
+            "disk_path": disk_path,
+            "iso_path": iso_path,
+            "virtio_iso_path": virtio_iso_path,
+            "mac": _random_mac(),
+            "display_devices": display_devices,
+            "tpm": tpm,
+        })
+
+    def generate_many(self, specs: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        Generate XML for a batch of new Windows VMs.
+
+        Each spec holds the keyword arguments of generate_windows_vm_xml().
+        The per-VM NVRAM copies are the only I/O in generation, so they are
+        done up front in parallel; rendering then only formats strings.
+        """
+        specs = list(specs)
+        if not specs:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(8, len(specs))) as pool:
+            list(pool.map(self._prepare_ovmf_vars_file, (spec["vm_name"] for spec in specs)))
+
+        return [self.generate_windows_vm_xml(**spec) for spec in specs]
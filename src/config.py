@@ -5,6 +5,20 @@ Global configuration and constants for VirtFlow
 import os
 from pathlib import Path
 
+__all__ = [
+    "APP_NAME", "APP_VERSION", "APP_AUTHOR", "APP_DESCRIPTION",
+    "COLOR_BACKGROUND",
+    "BASE_DIR", "ASSETS_DIR", "ICONS_DIR", "STYLES_DIR",
+    "DEFAULT_LIBVIRT_URI", "VM_STORAGE_POOL", "DEFAULT_VM_RAM",
+    "DEFAULT_VM_VCPUS", "DEFAULT_VM_DISK_SIZE",
+    "VFIO_DRIVER", "IOMMU_GROUPS_PATH",
+    "WINDOW_MIN_WIDTH", "WINDOW_MIN_HEIGHT", "DEFAULT_THEME",
+    "ENABLE_ANIMATIONS", "ANIMATION_DURATION",
+    "LOG_LEVEL", "LOG_FILE",
+    "CACHE_DIR", "OVMF_CACHE_FILE",
+    "GPU_VENDOR_NVIDIA", "GPU_VENDOR_AMD", "GPU_VENDOR_INTEL",
+]
+
 # Application metadata
 APP_NAME = "VirtFlow"
 APP_VERSION = "0.1.0"
@@ -41,6 +55,10 @@ ANIMATION_DURATION = 300  # ms
 LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR
 LOG_FILE = Path.home() / ".local" / "share" / "virtflow" / "virtflow.log"
 
+# Cache
+CACHE_DIR = Path.home() / ".cache" / "virtflow"
+OVMF_CACHE_FILE = CACHE_DIR / "ovmf_paths.json"
+
 # Ensure log directory exists
 LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
 
@@ -6,20 +6,28 @@ VirtFlow - Main Entry Point
 import sys
 import os
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # PySide6 imports
 from PySide6.QtWidgets import QApplication, QMessageBox, QDialog
-from PySide6.QtCore import Qt, QCoreApplication
+from PySide6.QtCore import Qt, QCoreApplication, QThread, Signal
 from PySide6.QtGui import QIcon, QFontDatabase
 
 # Local imports
-# --- NEW UI IMPORTS ---
-from ui.main_window import MainWindow
-# --- END NEW UI IMPORTS ---
+# MainWindow and the backend checkers pull in libvirt and the whole UI
+# tree; they are imported where first needed so the QApplication exists
+# before that work starts.
 from utils.logger import setup_logger
-from backend.system_checker import SystemChecker
+from utils.stylesheet import load_stylesheet
 import config
 
+def _read_font_file(font_file: Path) -> bytes:
+    """Read a font file, returning empty data (rejected by Qt) on error."""
+    try:
+        return font_file.read_bytes()
+    except OSError:
+        return b""
+
 def load_fonts():
     """Load custom fonts from the assets directory."""
     fonts_dir = config.BASE_DIR / "ui" / "assets" / "fonts"
@@ -29,8 +37,29 @@ def load_fonts():
         logger.warning(f"No fonts found in {fonts_dir}. Using system defaults.")
         return
 
+    # Skip fonts the system already provides in the same style. File names
+    # follow the "<Family>-<Style>.ttf" convention but drop the spaces of the
+    # real names ("JetBrainsMono-Regular.ttf" is family "JetBrains Mono"),
+    # so names are compared with whitespace removed.
+    def squash(name):
+        return "".join(name.split()).lower()
+
+    system_families = {squash(family): family for family in QFontDatabase.families()}
+    pending = []
     for font_file in font_files:
-        font_id = QFontDatabase.addApplicationFont(str(font_file))
+        family, _, style = font_file.stem.partition("-")
+        installed = system_families.get(squash(family))
+        if installed and squash(style) in {squash(s) for s in QFontDatabase.styles(installed)}:
+            logger.debug(f"Font already installed, skipping: {font_file.name}")
+            continue
+        pending.append(font_file)
+
+    # Read the files concurrently; registration stays on the GUI thread
+    with ThreadPoolExecutor() as pool:
+        font_data = list(pool.map(_read_font_file, pending))
+
+    for font_file, data in zip(pending, font_data):
+        font_id = QFontDatabase.addApplicationFontFromData(data)
         if font_id == -1:
             logger.warning(f"Failed to load font: {font_file}")
         else:
@@ -43,6 +72,7 @@ def check_system_requirements():
     Returns: tuple (bool, str) - (success, error_message)
     """
     from backend.dependency_checker import DependencyChecker
+    from backend.system_checker import SystemChecker
     
     checker_dep = DependencyChecker()
     checker = SystemChecker()
@@ -51,8 +81,17 @@ def check_system_requirements():
     if os.geteuid() == 0:
         return False, "Please do not run VirtFlow as root. Add your user to 'libvirt' group instead."
     
+    # The probes are independent (PATH lookups, systemctl, sysfs), so run
+    # them all at once; results are still reported in priority order below.
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        deps_future = pool.submit(checker_dep.check_all_dependencies)
+        groups_future = pool.submit(checker_dep.check_user_groups)
+        libvirt_future = pool.submit(checker.is_libvirt_running)
+        kvm_future = pool.submit(checker.has_kvm_support)
+        iommu_future = pool.submit(checker.has_iommu_enabled)
+    
     # Check system dependencies
-    deps_ok, missing_packages = checker_dep.check_all_dependencies()
+    deps_ok, missing_packages = deps_future.result()
     if not deps_ok:
         install_cmd = checker_dep.get_install_command(missing_packages)
         return False, (
@@ -61,7 +100,7 @@ def check_system_requirements():
         )
     
     # Check user groups
-    groups_ok, missing_groups = checker_dep.check_user_groups()
+    groups_ok, missing_groups = groups_future.result()
     if not groups_ok:
         return False, (
             f"User not in required groups: {', '.join(missing_groups)}\n\n"
@@ -71,21 +110,34 @@ def check_system_requirements():
         )
     
     # Check libvirt daemon
-    if not checker.is_libvirt_running():
+    if not libvirt_future.result():
         return False, "libvirtd service is not running. Please start it:\nsudo systemctl start libvirtd"
     
     # Check KVM support
-    if not checker.has_kvm_support():
+    if not kvm_future.result():
         return False, "KVM virtualization is not available. Check BIOS settings and CPU support."
     
     # Check IOMMU (warning only, not fatal)
-    if not checker.has_iommu_enabled():
+    if not iommu_future.result():
         print("[WARNING] IOMMU is not enabled. GPU passthrough will not work.")
         print("Please enable IOMMU in BIOS and add 'intel_iommu=on' or 'amd_iommu=on' to kernel parameters.")
     
     return True, ""
 
 
+class RequirementsCheckWorker(QThread):
+    """Worker thread running check_system_requirements() off the GUI thread"""
+    requirements_checked = Signal(bool, str) # success, error_message
+    
+    def run(self):
+        try:
+            success, error_msg = check_system_requirements()
+        except Exception as e:
+            logger.exception(f"Exception while checking system requirements: {e}")
+            success, error_msg = False, str(e)
+        self.requirements_checked.emit(success, error_msg)
+
+
 def main():
     """Main application entry point"""
     
@@ -110,23 +162,15 @@ def main():
     load_fonts()
 
     # --- NEW: Load the Nebula Stylesheet ---
-    try:
-        style_path = config.STYLES_DIR / "nebula.qss"
-        with open(style_path, "r") as f:
-            app.setStyleSheet(f.read())
+    style_path = config.STYLES_DIR / "nebula.qss"
+    stylesheet = load_stylesheet(style_path)
+    if stylesheet:
+        app.setStyleSheet(stylesheet)
         logger.info(f"Loaded stylesheet: {style_path}")
-    except Exception as e:
-        logger.error(f"Failed to load stylesheet: {e}")
+    else:
+        logger.error(f"Failed to load stylesheet: {style_path}")
     # --- END NEW SECTION ---
     
-    # Check system requirements
-    success, error_msg = check_system_requirements()
-    if not success:
-        from ui.setup_dialog import SetupDialog
-        setup = SetupDialog()
-        if setup.exec() != QDialog.Accepted:
-            return 1
-    
     # Set application icon (We'll make a new one later)
     # icon_path = config.ICONS_DIR / "app_icon.png"
     # if icon_path.exists():
@@ -134,6 +178,7 @@ def main():
     
     # Create and show main window
     try:
+        from ui.main_window import MainWindow
         main_window = MainWindow()
         main_window.show()
         logger.info("Main window displayed successfully")
@@ -146,8 +191,23 @@ def main():
         )
         return 1
     
+    # Check system requirements in the background so the window paints
+    # immediately; VM creation stays disabled until the checks pass.
+    def on_requirements_checked(success: bool, error_msg: str):
+        main_window.on_requirements_checked(success, error_msg)
+        if not success:
+            from ui.setup_dialog import SetupDialog
+            setup = SetupDialog(main_window)
+            if setup.exec() != QDialog.Accepted:
+                app.exit(1)
+
+    requirements_worker = RequirementsCheckWorker()
+    requirements_worker.requirements_checked.connect(on_requirements_checked)
+    requirements_worker.start()
+    
     # Run application event loop
     exit_code = app.exec()
+    requirements_worker.wait()
     logger.info(f"{config.APP_NAME} exiting with code {exit_code}")
     return exit_code
 
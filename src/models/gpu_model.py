@@ -3,12 +3,18 @@ GPU model for UI representation
 """
 
 from dataclasses import dataclass
+from functools import cached_property
 from typing import List
 
 
-@dataclass
+@dataclass(frozen=True)
 class GPUModel:
-    """UI-friendly GPU model"""
+    """
+    UI-friendly GPU model
+
+    Immutable snapshot of a detected GPU; build a new one after a rescan
+    rather than mutating it, so the cached display properties stay valid.
+    """
     
     pci_address: str
     vendor: str  # NVIDIA, AMD, Intel
@@ -19,13 +25,13 @@ class GPUModel:
     driver: str
     related_device_count: int
     
-    @property
+    @cached_property
     def display_name(self) -> str:
         """Get display-friendly name"""
         primary_badge = " [Primary]" if self.is_primary else ""
         return f"{self.vendor} {self.model}{primary_badge}"
     
-    @property
+    @cached_property
     def status_text(self) -> str:
         """Get status description"""
         if not self.can_passthrough:
@@ -35,7 +41,7 @@ class GPUModel:
                 return "Passthrough unavailable"
         return "Available for passthrough"
     
-    @property
+    @cached_property
     def status_color(self) -> str:
         """Get color for status"""
         if self.can_passthrough:
@@ -2,13 +2,22 @@
 VM data model for UI representation
 """
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
 
 
-@dataclass
+# Last model built per VM UUID, with the libvirt values it was built from
+_model_cache: Dict[str, Tuple[tuple, "VMModel"]] = {}
+
+
+@dataclass(slots=True, frozen=True)
 class VMModel:
-    """Data model for a virtual machine"""
+    """
+    Data model for a virtual machine
+
+    Immutable snapshot of one libvirt poll; polls that report no changes
+    reuse the previous instance (see from_libvirt_info).
+    """
     
     name: str
     uuid: str
@@ -23,26 +32,42 @@ class VMModel:
     has_gpu_passthrough: bool = False
     gpu_vendor: Optional[str] = None
     
-    # --- ADD THESE 4 LINES ---
+    # I/O counters (cumulative bytes, from libvirt stats)
     disk_read_bytes: int = 0
     disk_write_bytes: int = 0
     net_rx_bytes: int = 0
     net_tx_bytes: int = 0
     
-    @property
-    def memory_gb(self) -> float:
-        """Get current memory in GB"""
-        return self.current_memory_mb / 1024
+    # Derived once in __post_init__ (the model is immutable)
+    memory_gb: float = field(init=False, repr=False, compare=False)  # current memory in GB
+    max_memory_gb: float = field(init=False, repr=False, compare=False)  # max memory in GB
     
-    @property
-    def max_memory_gb(self) -> float:
-        """Get max memory in GB"""
-        return self.max_memory_mb / 1024
+    def __post_init__(self):
+        # Frozen dataclass: derived fields have to bypass __setattr__
+        object.__setattr__(self, 'memory_gb', self.current_memory_mb / 1024)
+        object.__setattr__(self, 'max_memory_gb', self.max_memory_mb / 1024)
     
     @classmethod
     def from_libvirt_info(cls, info: dict):
-        """Create VMModel from libvirt info dictionary"""
-        return cls(
+        """
+        Create VMModel from libvirt info dictionary
+
+        If nothing changed since the previous poll of the same VM, the
+        previous instance is returned, so callers can detect "no change"
+        with an identity check.
+        """
+        key = (
+            info['name'], info['state'], info['state_name'], info['is_active'],
+            info['is_persistent'], info['max_memory'], info['memory'],
+            info['vcpus'], info['autostart'],
+            info.get('disk_read_bytes', 0), info.get('disk_write_bytes', 0),
+            info.get('net_rx_bytes', 0), info.get('net_tx_bytes', 0),
+        )
+        cached = _model_cache.get(info['uuid'])
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        vm = cls(
             name=info['name'],
             uuid=info['uuid'],
             state=info['state'],
@@ -53,9 +78,23 @@ class VMModel:
             current_memory_mb=info['memory'] // 1024,
             vcpus=info['vcpus'],
             autostart=info['autostart'],
-            # --- ADD THESE 4 LINES (with .get() for safety) ---
+            # I/O counters are optional in the info dict
             disk_read_bytes=info.get('disk_read_bytes', 0),
             disk_write_bytes=info.get('disk_write_bytes', 0),
             net_rx_bytes=info.get('net_rx_bytes', 0),
             net_tx_bytes=info.get('net_tx_bytes', 0)
-        )
\ No newline at end of file
+        )
+        _model_cache[vm.uuid] = (key, vm)
+        return vm
+
+    @classmethod
+    def prune_cache(cls, keep: Iterable[str]):
+        """
+        Forget cached models of VMs that no longer exist
+
+        Args:
+            keep: UUIDs of the VMs libvirt still reports
+        """
+        keep = set(keep)
+        for uuid in [uuid for uuid in _model_cache if uuid not in keep]:
+            del _model_cache[uuid]
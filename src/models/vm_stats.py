@@ -0,0 +1,32 @@
+"""
+VM I/O rate calculation from consecutive VMModel snapshots
+"""
+
+from typing import Dict
+
+from models.vm_model import VMModel
+
+
+def compute_rates(prev: VMModel, curr: VMModel, time_delta: float) -> Dict[str, float]:
+    """
+    Compute per-second disk and network rates between two polls of a VM
+
+    Args:
+        prev: Snapshot from the previous poll
+        curr: Snapshot from the current poll
+        time_delta: Seconds between the two polls
+
+    Returns:
+        Dict with disk_read, disk_write, net_rx and net_tx in bytes/s
+        (negative deltas, e.g. after a counter reset, are clamped to 0),
+        or an empty dict if time_delta is not positive
+    """
+    if time_delta <= 0:
+        return {}
+
+    return {
+        'disk_read': max(0, (curr.disk_read_bytes - prev.disk_read_bytes) / time_delta),
+        'disk_write': max(0, (curr.disk_write_bytes - prev.disk_write_bytes) / time_delta),
+        'net_rx': max(0, (curr.net_rx_bytes - prev.net_rx_bytes) / time_delta),
+        'net_tx': max(0, (curr.net_tx_bytes - prev.net_tx_bytes) / time_delta),
+    }
@@ -3,13 +3,41 @@ Animated Background Widget (Nebula UI)
 Creates a 3D-like animated background similar to the Three.js effect in GG.html
 """
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import QTimer, QPropertyAnimation, QEasingCurve, QRect, Qt
-from PySide6.QtGui import QPainter, QBrush, QRadialGradient, QColor, QPen
+from PySide6.QtCore import QTimer, QPropertyAnimation, QEasingCurve, QRectF, Qt
+from PySide6.QtGui import QPainter, QBrush, QRadialGradient, QGradient, QColor, QRegion, QPixmap
 import math
 import random
+import config
+
+# Pulse scale factor (0.8 + 0.2 * sin(phase)) sampled over one period, so the
+# per-frame pulse is a table lookup rather than a sin() call per orb.
+_PULSE_LUT_SIZE = 1024  # power of two, so wrap-around is a bit mask
+_PULSE_LUT_SCALE = _PULSE_LUT_SIZE / (2 * math.pi)
+_PULSE_LUT = [0.8 + 0.2 * math.sin(i / _PULSE_LUT_SCALE) for i in range(_PULSE_LUT_SIZE)]
+
+# Window background behind the orbs (#0f172a)
+_BACKGROUND_COLOR = QColor(config.COLOR_BACKGROUND)
+
+# Orb palette; orbs share these colors (and so their cached glow pixmaps)
+_ORB_COLORS = (
+    QColor(79, 70, 229, 100),   # Indigo
+    QColor(192, 38, 211, 100),  # Fuchsia
+    QColor(6, 182, 212, 100),   # Cyan
+    QColor(99, 102, 241, 100),  # Blue
+    QColor(168, 85, 247, 100),  # Purple
+)
+
+# Largest orb diameter (init_orbs sizes are at most 200 and the pulse never
+# grows them); glow pixmaps are rendered at this size and scaled down.
+_ORB_MAX_SIZE = 200
 
 class FloatingOrb:
     """Represents a floating orb in the background"""
+    # Fixed attribute layout: no per-orb __dict__, cheaper attribute access
+    # in the per-frame update loop.
+    __slots__ = ('x', 'y', 'size', 'color', 'vel_x', 'vel_y', 'rotation',
+                 'pulse_phase', 'brush', 'current_size', 'curr_rect', 'prev_rect')
+
     def __init__(self, x, y, size, color, vel_x=0, vel_y=0):
         self.x = x
         self.y = y
@@ -19,6 +47,44 @@ class FloatingOrb:
         self.vel_y = vel_y
         self.rotation = 0
         self.pulse_phase = random.uniform(0, math.pi * 2)
+
+        # Glow brush, built once: the gradient is laid out relative to the
+        # bounding box of whatever ellipse is drawn with it, so it follows
+        # the orb's position and pulsing size without being rebuilt.
+        gradient = QRadialGradient(0.5, 0.5, 0.5)
+        gradient.setCoordinateMode(QGradient.ObjectBoundingMode)
+
+        # Center color (more opaque)
+        center_color = QColor(color)
+        center_color.setAlpha(int(color.alpha() * 0.8))
+        gradient.setColorAt(0, center_color)
+
+        # Mid color
+        mid_color = QColor(color)
+        mid_color.setAlpha(int(color.alpha() * 0.4))
+        gradient.setColorAt(0.7, mid_color)
+
+        # Edge color (transparent)
+        edge_color = QColor(color)
+        edge_color.setAlpha(0)
+        gradient.setColorAt(1, edge_color)
+
+        self.brush = QBrush(gradient)
+
+        # Area covered on screen, before and after the latest update
+        self.current_size = self._pulsed_size()
+        self.curr_rect = self._bounding_rect()
+        self.prev_rect = self.curr_rect
+
+    def _pulsed_size(self):
+        """Diameter including the breathing pulse effect"""
+        return self.size * _PULSE_LUT[int(self.pulse_phase * _PULSE_LUT_SCALE) & (_PULSE_LUT_SIZE - 1)]
+
+    def _bounding_rect(self):
+        """Integer rect covering the orb (plus a pixel for antialiasing)"""
+        half = self.current_size * 0.5
+        return QRectF(self.x - half, self.y - half,
+                      self.current_size, self.current_size).toAlignedRect().adjusted(-1, -1, 1, 1)
         
     def update(self, width, height, time):
         """Update orb position and properties"""
@@ -26,11 +92,10 @@ class FloatingOrb:
         self.x += self.vel_x
         self.y += self.vel_y
         
-        # Bounce off edges
-        if self.x <= 0 or self.x >= width:
-            self.vel_x *= -1
-        if self.y <= 0 or self.y >= height:
-            self.vel_y *= -1
+        # Bounce off edges: flip the velocity sign without branching
+        # (True/False act as 1/0)
+        self.vel_x -= 2 * self.vel_x * ((self.x <= 0) | (self.x >= width))
+        self.vel_y -= 2 * self.vel_y * ((self.y <= 0) | (self.y >= height))
             
         # Keep in bounds
         self.x = max(0, min(width, self.x))
@@ -39,41 +104,50 @@ class FloatingOrb:
         # Update rotation and pulse
         self.rotation += 0.01
         self.pulse_phase += 0.02
+        self.current_size = self._pulsed_size()
+
+        # Track the damaged area for partial repaints
+        self.prev_rect = self.curr_rect
+        self.curr_rect = self._bounding_rect()
 
 class AnimatedBackground(QWidget):
     """Animated background widget with floating orbs"""
+
+    # Pre-rendered orb glows keyed by rgba, one per palette color at
+    # _ORB_MAX_SIZE for the current device pixel ratio. Blitting a cached
+    # pixmap is far cheaper than rasterizing the radial gradient for every
+    # orb on every frame.
+    _pix_cache = {}
+    _pix_cache_ratio = None
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("AnimatedBackground")
+        # paintEvent fills every dirty pixel opaquely, so Qt can skip
+        # erasing/painting whatever lies beneath first.
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
         
         # Create floating orbs
         self.orbs = []
         self.time = 0
         
-        # Animation timer
-        self.timer = QTimer()
+        # Animation timer (runs only while the widget is shown)
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_animation)
-        self.timer.start(16)  # ~60 FPS
         
         # Initialize orbs
         self.init_orbs()
         
     def init_orbs(self):
         """Initialize floating orbs"""
-        colors = [
-            QColor(79, 70, 229, 100),   # Indigo
-            QColor(192, 38, 211, 100),  # Fuchsia  
-            QColor(6, 182, 212, 100),   # Cyan
-            QColor(99, 102, 241, 100),  # Blue
-            QColor(168, 85, 247, 100),  # Purple
-        ]
-        
+        # Replace (not add to) the current set, so resizes don't pile up orbs
+        self.orbs = []
         for i in range(8):  # Create 8 orbs
             x = random.uniform(0, 800)
             y = random.uniform(0, 600)
             size = random.uniform(80, 200)
-            color = random.choice(colors)
+            color = random.choice(_ORB_COLORS)
             vel_x = random.uniform(-0.5, 0.5)
             vel_y = random.uniform(-0.5, 0.5)
             
@@ -84,12 +158,26 @@ class AnimatedBackground(QWidget):
         """Update animation frame"""
         self.time += 0.016  # 16ms per frame
         
-        # Update all orbs
+        # Update all orbs, collecting the area they left and now cover
+        width, height = self.width(), self.height()
+        damaged = QRegion()
         for orb in self.orbs:
-            orb.update(self.width(), self.height(), self.time)
+            orb.update(width, height, self.time)
+            damaged += orb.prev_rect
+            damaged += orb.curr_rect
             
-        self.update()  # Trigger repaint
+        self.update(damaged)  # Repaint only where orbs moved
     
+    def showEvent(self, event):
+        """Start animating when the widget becomes visible"""
+        super().showEvent(event)
+        self.timer.start(16)  # ~60 FPS
+
+    def hideEvent(self, event):
+        """Stop animating while hidden (e.g. window minimized)"""
+        super().hideEvent(event)
+        self.timer.stop()
+
     def resizeEvent(self, event):
         """Handle resize events"""
         super().resizeEvent(event)
@@ -97,56 +185,54 @@ class AnimatedBackground(QWidget):
         if self.width() > 0 and self.height() > 0:
             self.init_orbs()
     
+    def _orb_pixmap(self, orb):
+        """Get (rendering on first use) the full-size glow pixmap for an orb's color"""
+        ratio = self.devicePixelRatioF()
+        cls = AnimatedBackground
+        if cls._pix_cache_ratio != ratio:
+            # Moved to a screen with another scale: drop the old set
+            cls._pix_cache = {}
+            cls._pix_cache_ratio = ratio
+
+        key = orb.color.rgba()
+        pixmap = cls._pix_cache.get(key)
+        if pixmap is None:
+            size = _ORB_MAX_SIZE
+            pixmap = QPixmap(math.ceil(size * ratio), math.ceil(size * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+
+            pix_painter = QPainter(pixmap)
+            pix_painter.setRenderHint(QPainter.Antialiasing)
+            pix_painter.setPen(Qt.NoPen)
+            pix_painter.setBrush(orb.brush)
+            pix_painter.drawEllipse(QRectF(0, 0, size, size))
+            pix_painter.end()
+
+            cls._pix_cache[key] = pixmap
+        return pixmap
+
     def paintEvent(self, event):
         """Paint the animated background"""
+        # Orbs are antialiased when their pixmaps are rendered; blitting
+        # them needs no pen or brush state.
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        # Glows are drawn scaled down from the full-size pixmap
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
         
-        # Fill with dark background
-        painter.fillRect(self.rect(), QColor(15, 23, 42))  # #0f172a
+        # Fill with dark background (only the area being repainted)
+        dirty = event.rect()
+        painter.fillRect(dirty, _BACKGROUND_COLOR)
         
         # Draw orbs with blur effect
         for orb in self.orbs:
-            # Calculate pulse effect
-            pulse = 0.8 + 0.2 * math.sin(orb.pulse_phase)
-            current_size = orb.size * pulse
-            
-            # Create radial gradient for glow effect
-            gradient = QRadialGradient(orb.x, orb.y, current_size / 2)
-            
-            # Center color (more opaque)
-            center_color = QColor(orb.color)
-            center_color.setAlpha(int(orb.color.alpha() * 0.8))
-            gradient.setColorAt(0, center_color)
-            
-            # Mid color
-            mid_color = QColor(orb.color)
-            mid_color.setAlpha(int(orb.color.alpha() * 0.4))
-            gradient.setColorAt(0.7, mid_color)
-            
-            # Edge color (transparent)
-            edge_color = QColor(orb.color)
-            edge_color.setAlpha(0)
-            gradient.setColorAt(1, edge_color)
-            
-            # Draw the orb
-            painter.setBrush(QBrush(gradient))
-            painter.setPen(Qt.NoPen)
-            
-            orb_rect = QRect(
-                int(orb.x - current_size / 2),
-                int(orb.y - current_size / 2),
-                int(current_size),
-                int(current_size)
-            )
-            
-            painter.drawEllipse(orb_rect)
-        
-        # Add subtle camera sway effect
-        sway_x = 2 * math.sin(self.time * 0.5)
-        sway_y = 2 * math.cos(self.time * 0.5)
-        
-        # Apply transform for sway (subtle movement)
-        painter.translate(sway_x, sway_y)
+            if not orb.curr_rect.intersects(dirty):
+                continue
+
+            size = orb.current_size
+            half = size * 0.5
+            pixmap = self._orb_pixmap(orb)
+            painter.drawPixmap(QRectF(orb.x - half, orb.y - half, size, size),
+                               pixmap, QRectF(pixmap.rect()))
         
         painter.end()
@@ -5,22 +5,36 @@ VM Creation Wizard - Multi-step interface for creating Windows VMs
 from PySide6.QtWidgets import (
     QWizard, QWizardPage, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QSpinBox, QPushButton, QFileDialog,
-    QCheckBox, QComboBox, QGroupBox, QMessageBox, QTextEdit
+    QCheckBox, QComboBox, QGroupBox, QMessageBox, QTextEdit, QApplication
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QThread
 from PySide6.QtGui import QFont
 
-from typing import Optional
+from dataclasses import dataclass
+from typing import List, Optional
 from pathlib import Path
 
-from backend.gpu_detector import GPUDetector, GPU
+from backend.gpu_detector import GPU
+from backend.gpu_detector_cache import get_detector
 from backend.xml_generator import XMLGenerator
 from backend.libvirt_manager import LibvirtManager
+from backend.libvirt_pool import get_manager
 from models.gpu_model import GPUModel
 from utils.logger import logger
 import config
 
 
+# Rescan GPUs for the wizard at most this often; scanning walks sysfs and
+# parses pci.ids (lspci only as a fallback), so repeat wizard opens reuse
+# the shared detector.
+_GPU_CACHE_TTL = 30.0  # seconds
+
+
+def _get_passthrough_gpus() -> List[GPU]:
+    """Get passthrough-capable GPUs, rescanning at most every _GPU_CACHE_TTL seconds"""
+    return get_detector(max_age=_GPU_CACHE_TTL).get_passthrough_gpus()
+
+
 class IntroPage(QWizardPage):
     """Introduction page"""
     
@@ -162,7 +176,6 @@ class GPUPage(QWizardPage):
         self.setTitle("GPU Passthrough")
         self.setSubTitle("Select GPU for passthrough (optional)")
         
-        self.detector = GPUDetector()
         self.selected_gpu: Optional[GPU] = None
         
         layout = QVBoxLayout(self)
@@ -202,7 +215,7 @@ class GPUPage(QWizardPage):
         self.gpu_combo.clear()
         self.gpu_combo.addItem("No GPU Passthrough", None)
         
-        for gpu in self.detector.get_passthrough_gpus():
+        for gpu in _get_passthrough_gpus():
             display_name = f"{gpu.full_name} ({gpu.pci_address})"
             self.gpu_combo.addItem(display_name, gpu)
     
@@ -234,16 +247,126 @@ class SummaryPage(QWizardPage):
         disk_size = self.field("disk_size")
         enable_gpu = self.field("enable_gpu_passthrough")
         
-        summary = f"VM Configuration:\n\n"
-        summary += f"Name: {vm_name}\n"
-        summary += f"Memory: {memory} MB\n"
-        summary += f"CPUs: {vcpus}\n"
-        summary += f"TPM 2.0: {'Enabled' if enable_tpm else 'Disabled'}\n"
-        summary += f"Disk Size: {disk_size} GB\n"
-        summary += f"Windows ISO: {Path(iso_path).name}\n"
-        summary += f"GPU Passthrough: {'Enabled' if enable_gpu else 'Disabled'}\n"
+        lines = [
+            "VM Configuration:",
+            "",
+            f"Name: {vm_name}",
+            f"Memory: {memory} MB",
+            f"CPUs: {vcpus}",
+            f"TPM 2.0: {'Enabled' if enable_tpm else 'Disabled'}",
+            f"Disk Size: {disk_size} GB",
+            f"Windows ISO: {Path(iso_path).name}",
+            f"GPU Passthrough: {'Enabled' if enable_gpu else 'Disabled'}",
+        ]
         
-        self.summary_text.setPlainText(summary)
+        self.summary_text.setPlainText("\n".join(lines) + "\n")
+
+
+@dataclass(frozen=True)
+class CreateVMParams:
+    """Wizard field values needed to create the VM"""
+    vm_name: str
+    memory_mb: int
+    vcpus: int
+    enable_tpm: bool
+    iso_path: str
+    virtio_iso_path: str
+    disk_size_gb: int
+
+
+class CreateVMWorker(QThread):
+    """
+    Worker thread for creating the VM: ISO checks, disk image, XML and define.
+
+    The path checks and qemu-img can block for a long time (e.g. on network
+    mounts), so none of it runs on the GUI thread.
+    """
+    disk_exists = Signal(str)  # disk_path, needs overwrite confirmation
+    creation_finished = Signal(bool, str, str)  # success, title, message
+
+    def __init__(self, xml_generator: XMLGenerator, manager: LibvirtManager,
+                 params: CreateVMParams, overwrite_disk: bool = False):
+        super().__init__()
+        self.xml_generator = xml_generator
+        self.manager = manager
+        self.params = params
+        self.overwrite_disk = overwrite_disk
+        self.domain = None
+
+    def run(self):
+        try:
+            self._create_vm()
+        except Exception as e:
+            logger.exception("Failed to create VM")
+            self.creation_finished.emit(
+                False, "Error",
+                f"Failed to create VM:\n\n{str(e)}\n\n"
+                "Check the logs for more details."
+            )
+
+    def _create_vm(self):
+        p = self.params
+        vm_name = p.vm_name
+
+        if not Path(p.iso_path).exists():
+            self.creation_finished.emit(False, "Error", f"Windows ISO not found: {p.iso_path}")
+            return
+
+        if not Path(p.virtio_iso_path).exists():
+            self.creation_finished.emit(False, "Error", f"VirtIO ISO not found: {p.virtio_iso_path}")
+            return
+
+        # Use DiskManager for disk creation
+        from backend.disk_manager import DiskManager
+        disk_mgr = DiskManager()
+
+        # Create disk image
+        disk_path = disk_mgr.get_disk_path(vm_name)
+
+        if Path(disk_path).exists():
+            if not self.overwrite_disk:
+                self.disk_exists.emit(str(disk_path))
+                return
+            disk_mgr.delete_disk(disk_path)
+
+        logger.info(f"Creating disk: {disk_path} ({p.disk_size_gb}GB)")
+        if not disk_mgr.create_disk_image(disk_path, p.disk_size_gb):
+            self.creation_finished.emit(
+                False,
+                "Disk Creation Failed",
+                f"Failed to create disk image.\n\n"
+                f"Check that qemu-img is installed and you have write permissions to:\n"
+                f"{disk_path}"
+            )
+            return
+
+        # Generate XML (without GPU for first boot)
+        xml = self.xml_generator.generate_windows_vm_xml(
+            vm_name=vm_name,
+            memory_mb=p.memory_mb,
+            vcpus=p.vcpus,
+            disk_path=disk_path,
+            iso_path=p.iso_path,
+            virtio_iso_path=p.virtio_iso_path,
+            gpu=None,  # No GPU on first boot
+            enable_tpm=p.enable_tpm,
+            enable_gpu_passthrough=False
+        )
+
+        # Create VM
+        self.domain = self.manager.create_vm_from_xml(xml)
+
+        if not self.domain:
+            # Cleanup disk if VM creation failed
+            disk_mgr.delete_disk(disk_path)
+            self.creation_finished.emit(
+                False,
+                "VM Creation Failed",
+                "Failed to create VM. Check libvirt logs for details."
+            )
+            return
+
+        self.creation_finished.emit(True, "", "")
 
 
 class CreateVMWizard(QWizard):
@@ -267,7 +390,9 @@ class CreateVMWizard(QWizard):
         
         # Setup
         self.xml_generator = XMLGenerator()
-        self.manager = LibvirtManager()
+        self.manager = get_manager()
+        self._create_worker: Optional[CreateVMWorker] = None
+        self._params: Optional[CreateVMParams] = None
         
         # Apply theme
         self._apply_theme()
@@ -319,113 +444,97 @@ class CreateVMWizard(QWizard):
     
     def accept(self):
         """Create VM when wizard finishes"""
-        try:
-            logger.info("Creating VM from wizard...")
-            
-            # Get all fields
-            vm_name = self.field("vm_name")
-            memory = self.field("memory")
-            vcpus = self.field("vcpus")
-            enable_tpm = self.field("enable_tpm")
-            iso_path = self.field("iso_path")
-            virtio_iso = self.field("virtio_iso_path")
-            disk_size = self.field("disk_size")
-            enable_gpu = self.field("enable_gpu_passthrough")
-            
-            # Validate inputs
-            if not vm_name or len(vm_name.strip()) == 0:
-                QMessageBox.critical(self, "Error", "VM name cannot be empty")
-                return
-            
-            if not Path(iso_path).exists():
-                QMessageBox.critical(self, "Error", f"Windows ISO not found: {iso_path}")
-                return
-            
-            if not Path(virtio_iso).exists():
-                QMessageBox.critical(self, "Error", f"VirtIO ISO not found: {virtio_iso}")
-                return
-            
-            # Use DiskManager for disk creation
-            from backend.disk_manager import DiskManager
-            disk_mgr = DiskManager()
-            
-            # Create disk image
-            disk_path = disk_mgr.get_disk_path(vm_name)
-            
-            if Path(disk_path).exists():
-                reply = QMessageBox.question(
-                    self,
-                    "Disk Exists",
-                    f"Disk already exists: {disk_path}\nOverwrite?",
-                    QMessageBox.Yes | QMessageBox.No
-                )
-                if reply == QMessageBox.No:
-                    return
-                disk_mgr.delete_disk(disk_path)
-            
-            logger.info(f"Creating disk: {disk_path} ({disk_size}GB)")
-            if not disk_mgr.create_disk_image(disk_path, disk_size):
-                QMessageBox.critical(
-                    self,
-                    "Disk Creation Failed",
-                    f"Failed to create disk image.\n\n"
-                    f"Check that qemu-img is installed and you have write permissions to:\n"
-                    f"{disk_path}"
-                )
-                return
-            
-            # Generate XML (without GPU for first boot)
-            from backend.xml_generator import XMLGenerator
-            xml_gen = XMLGenerator()
-            
-            xml = xml_gen.generate_windows_vm_xml(
-                vm_name=vm_name,
-                memory_mb=memory,
-                vcpus=vcpus,
-                disk_path=disk_path,
-                iso_path=iso_path,
-                virtio_iso_path=virtio_iso,
-                gpu=None,  # No GPU on first boot
-                enable_tpm=enable_tpm,
-                enable_gpu_passthrough=False
-            )
-            
-            # Create VM
-            domain = self.manager.create_vm_from_xml(xml)
-            
-            if domain:
-                reply = QMessageBox.question(
-                    self,
-                    "VM Created",
-                    f"VM '{vm_name}' created successfully!\n\n"
-                    f"Would you like to start it now?",
-                    QMessageBox.Yes | QMessageBox.No
-                )
+        if self._create_worker and self._create_worker.isRunning():
+            return
+
+        logger.info("Creating VM from wizard...")
+
+        # Get all fields
+        params = CreateVMParams(
+            vm_name=self.field("vm_name"),
+            memory_mb=self.field("memory"),
+            vcpus=self.field("vcpus"),
+            enable_tpm=self.field("enable_tpm"),
+            iso_path=self.field("iso_path"),
+            virtio_iso_path=self.field("virtio_iso_path"),
+            disk_size_gb=self.field("disk_size"),
+        )
+
+        # Validate inputs
+        if not params.vm_name or len(params.vm_name.strip()) == 0:
+            QMessageBox.critical(self, "Error", "VM name cannot be empty")
+            return
 
-                if reply == QMessageBox.Yes:
-                    from backend.vm_controller import VMController
-                    controller = VMController(self.manager)
-                    controller.start_vm_with_viewer(domain, fullscreen=False)
+        self._params = params
+        self._start_create_worker(overwrite_disk=False)
 
-                self.vm_created.emit(vm_name)
-                super().accept()
-            else:
+    def reject(self):
+        """Don't close the wizard under a running creation worker"""
+        if self._create_worker and self._create_worker.isRunning():
+            return
+        super().reject()
+
+    def _start_create_worker(self, overwrite_disk: bool):
+        """Run the file checks and VM creation off the GUI thread"""
+        self._create_worker = CreateVMWorker(
+            self.xml_generator, self.manager, self._params, overwrite_disk
+        )
+        self._create_worker.disk_exists.connect(self._on_disk_exists)
+        self._create_worker.creation_finished.connect(self._on_creation_finished)
+
+        self.button(QWizard.FinishButton).setEnabled(False)
+        QApplication.setOverrideCursor(Qt.BusyCursor)
+        self._create_worker.start()
+
+    def _end_create_worker(self):
+        """Restore the UI once the worker has stopped"""
+        QApplication.restoreOverrideCursor()
+        self.button(QWizard.FinishButton).setEnabled(True)
+
+    def _on_disk_exists(self, disk_path: str):
+        """Ask before overwriting an existing disk image"""
+        self._end_create_worker()
+        reply = QMessageBox.question(
+            self,
+            "Disk Exists",
+            f"Disk already exists: {disk_path}\nOverwrite?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self._start_create_worker(overwrite_disk=True)
+
+    def _on_creation_finished(self, success: bool, title: str, message: str):
+        """Report the result of the VM creation worker"""
+        self._end_create_worker()
+
+        if not success:
+            QMessageBox.critical(self, title, message)
+            return
+
+        vm_name = self._params.vm_name
+        reply = QMessageBox.question(
+            self,
+            "VM Created",
+            f"VM '{vm_name}' created successfully!\n\n"
+            f"Would you like to start it now?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+
+        if reply == QMessageBox.Yes:
+            try:
+                from backend.vm_controller import VMController
+                controller = VMController(self.manager)
+                controller.start_vm_with_viewer(self._create_worker.domain, fullscreen=False)
+            except Exception as e:
+                logger.exception("Failed to start VM")
                 QMessageBox.critical(
                     self,
-                    "VM Creation Failed",
-                    "Failed to create VM. Check libvirt logs for details."
+                    "Error",
+                    f"VM was created but failed to start:\n\n{str(e)}"
                 )
-                # Cleanup disk if VM creation failed
-                disk_mgr.delete_disk(disk_path)
-            
-        except Exception as e:
-            logger.exception("Failed to create VM")
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Failed to create VM:\n\n{str(e)}\n\n"
-                "Check the logs for more details."
-            )
+
+        self.vm_created.emit(vm_name)
+        super().accept()
     
     def _create_disk_image(self, path: str, size_gb: int):
         """Create qcow2 disk image"""
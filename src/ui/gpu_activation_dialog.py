@@ -4,15 +4,18 @@ GPU Activation Dialog - Orchestrates two-stage GPU passthrough activation
 
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QPushButton,
-    QProgressBar, QTextEdit, QMessageBox
+    QProgressBar, QPlainTextEdit, QMessageBox
 )
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtCore import Qt, QObject, QThread, Signal, Slot, QTimer
+from collections import deque
+from typing import TYPE_CHECKING, Deque, List, Optional
 
-from backend.gpu_detector import GPUDetector, GPU
-from backend.guest_driver_helper import GuestDriverHelper
-from backend.vm_gpu_configurator import VMGPUConfigurator
-from backend.libvirt_manager import LibvirtManager
 from utils.logger import logger
+from utils.stylesheet import load_stylesheet
+import config
+
+if TYPE_CHECKING:
+    from backend.gpu_detector import GPU
 
 
 class GPUActivationWorker(QThread):
@@ -21,11 +24,17 @@ class GPUActivationWorker(QThread):
     progress_updated = Signal(int, str)
     finished = Signal(bool, str)
     
-    def __init__(self, vm_name: str, gpu: GPU):
+    def __init__(self, vm_name: str, gpu: "GPU"):
         super().__init__()
+        # Backend modules (and libvirt) are only loaded once an activation
+        # is actually started, not when this dialog module is imported
+        from backend.guest_driver_helper import GuestDriverHelper
+        from backend.vm_gpu_configurator import VMGPUConfigurator
+        from backend.libvirt_pool import get_manager
+        
         self.vm_name = vm_name
         self.gpu = gpu
-        self.manager = LibvirtManager()
+        self.manager = get_manager()
         self.helper = GuestDriverHelper(self.manager)
         self.configurator = VMGPUConfigurator(self.manager)
     
@@ -43,6 +52,10 @@ class GPUActivationWorker(QThread):
             
             self.progress_updated.emit(80, "Updating VM configuration...")
             
+            # The GPU's driver binding changed - cached scans are now stale
+            from backend import gpu_detector_cache
+            gpu_detector_cache.invalidate()
+            
             # Stage 2: Success
             self.progress_updated.emit(100, "GPU passthrough enabled successfully!")
             self.finished.emit(
@@ -58,22 +71,77 @@ class GPUActivationWorker(QThread):
         except Exception as e:
             logger.exception("GPU activation failed")
             self.finished.emit(False, f"Unexpected error: {str(e)}")
-        finally:
-            # Clean up libvirt connection
-            try:
-                self.manager.disconnect()
-            except:
-                pass
+
+
+class _ActivationQueue(QObject):
+    """
+    Runs activations one at a time per process: rebinding GPUs and
+    redefining VMs concurrently would race, so workers from other dialogs
+    wait their turn. Lives on the GUI thread; workers report back to it
+    through queued connections.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._running: Optional[GPUActivationWorker] = None
+        self._queued: Deque[GPUActivationWorker] = deque()
+    
+    def submit(self, worker: GPUActivationWorker) -> bool:
+        """
+        Start an activation worker, or queue it behind the running one
+        
+        Returns:
+            bool: True if started now, False if queued
+        """
+        worker.finished.connect(self._on_worker_finished, Qt.QueuedConnection)
+        if self._running is None:
+            self._running = worker
+            worker.start()
+            return True
+        self._queued.append(worker)
+        return False
+    
+    @Slot(bool, str)
+    def _on_worker_finished(self, success: bool, message: str):
+        """Release the finished worker and start the next queued one"""
+        finished = self._running
+        if finished is not None:
+            # run() returns right after emitting; reap the thread
+            finished.wait()
+            finished.deleteLater()
+        self._running = self._queued.popleft() if self._queued else None
+        if self._running is not None:
+            self._running.start()
+
+
+_activation_queue: Optional[_ActivationQueue] = None
+
+
+def _get_activation_queue() -> _ActivationQueue:
+    """Get the process-wide activation queue (call from the GUI thread)"""
+    global _activation_queue
+    if _activation_queue is None:
+        _activation_queue = _ActivationQueue()
+    return _activation_queue
 
 
 class GPUActivationDialog(QDialog):
     """Dialog for activating GPU passthrough after driver installation"""
     
-    def __init__(self, vm_name: str, gpu: GPU, parent=None):
+    def __init__(self, vm_name: str, gpu: "GPU", parent=None):
         super().__init__(parent)
         
         self.vm_name = vm_name
         self.gpu = gpu
+        self.worker: Optional[GPUActivationWorker] = None
+        
+        # Progress updates are coalesced and applied at most every 50 ms
+        self._pending_progress: Optional[tuple] = None # (value, message)
+        self._pending_log: List[str] = []
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setInterval(50)
+        self._progress_timer.setSingleShot(True)
+        self._progress_timer.timeout.connect(self._flush_progress)
         
         self.setWindowTitle(f"Activate GPU Passthrough - {vm_name}")
         self.setMinimumSize(600, 400)
@@ -113,8 +181,9 @@ class GPUActivationDialog(QDialog):
         layout.addWidget(self.status_label)
         
         # Log
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(500)  # Bound memory on long runs
         self.log_text.setMaximumHeight(150)
         layout.addWidget(self.log_text)
         
@@ -130,79 +199,71 @@ class GPUActivationDialog(QDialog):
     
     def _apply_theme(self):
         """Apply dark theme"""
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #1E1E1E;
-                color: #FFFFFF;
-            }
-            QLabel {
-                color: #FFFFFF;
-            }
-            QProgressBar {
-                border: 2px solid #3E3E3E;
-                border-radius: 5px;
-                text-align: center;
-                color: #FFFFFF;
-            }
-            QProgressBar::chunk {
-                background-color: #0D7377;
-            }
-            QTextEdit {
-                background-color: #2B2B2B;
-                border: 1px solid #3E3E3E;
-                color: #FFFFFF;
-            }
-            QPushButton {
-                background-color: #0D7377;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                padding: 10px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #14FFEC;
-                color: #1E1E1E;
-            }
-            QPushButton:disabled {
-                background-color: #3E3E3E;
-                color: #666666;
-            }
-        """)
+        self.setStyleSheet(load_stylesheet(config.STYLES_DIR / "dark_dialog.qss"))
     
     def _start_activation(self):
         """Start GPU activation process"""
+        if self.worker is not None:
+            return # Already started or queued
+        
         self.start_btn.setEnabled(False)
-        self.log_text.append("Starting GPU activation...\n")
         
         # Create worker thread
         self.worker = GPUActivationWorker(self.vm_name, self.gpu)
         self.worker.progress_updated.connect(self._on_progress)
         self.worker.finished.connect(self._on_finished)
-        self.worker.start()
+        if _get_activation_queue().submit(self.worker):
+            self.log_text.appendPlainText("Starting GPU activation...\n")
+        else:
+            self.status_label.setText("Waiting for another GPU activation to finish...")
+            self.log_text.appendPlainText("Another GPU activation is in progress; queued.\n")
     
     def _on_progress(self, value: int, message: str):
-        """Handle progress update"""
-        self.progress_bar.setValue(value)
-        self.status_label.setText(message)
-        self.log_text.append(f"[{value}%] {message}")
+        """Handle progress update (buffered until the next flush)"""
+        self._pending_progress = (value, message)
+        self._pending_log.append(f"[{value}%] {message}")
+        if not self._progress_timer.isActive():
+            self._progress_timer.start()
+    
+    def _flush_progress(self):
+        """Apply buffered progress: latest value/status, all log lines at once"""
+        if self._pending_log:
+            self.log_text.appendPlainText("\n".join(self._pending_log))
+            self._pending_log.clear()
+        if self._pending_progress:
+            value, message = self._pending_progress
+            self.progress_bar.setValue(value)
+            self.status_label.setText(message)
+            self._pending_progress = None
     
     def _on_finished(self, success: bool, message: str):
         """Handle completion"""
+        self._progress_timer.stop()
+        self._flush_progress()
         self.close_btn.setEnabled(True)
         
+        # The activation queue reaps and deletes the finished worker
+        self.worker = None
+        
         if success:
-            self.log_text.append(f"\n✓ SUCCESS: {message}")
-            QMessageBox.information(
-                self,
+            self.log_text.appendPlainText(f"\n✓ SUCCESS: {message}")
+            self._show_result(
+                QMessageBox.Information,
                 "Success",
                 f"GPU passthrough activated successfully!\n\n"
                 f"VM '{self.vm_name}' now has access to {self.gpu.full_name}"
             )
         else:
-            self.log_text.append(f"\n✗ FAILED: {message}")
-            QMessageBox.critical(
-                self,
+            self.log_text.appendPlainText(f"\n✗ FAILED: {message}")
+            self._show_result(
+                QMessageBox.Critical,
                 "Failed",
                 f"GPU activation failed:\n{message}"
             )
+    
+    def _show_result(self, icon: QMessageBox.Icon, title: str, text: str):
+        """Show the outcome without blocking in a nested modal event loop"""
+        box = QMessageBox(icon, title, text, QMessageBox.Ok, self)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.setModal(False)
+        box.show()
@@ -8,12 +8,48 @@ from PySide6.QtWidgets import (
     QPushButton, QListWidget, QListWidgetItem, QMessageBox,
     QGroupBox, QTextEdit
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QColor
+from PySide6.QtCore import Qt, Signal, QThread
+from PySide6.QtGui import QColor, QBrush
+
+from typing import TYPE_CHECKING, List, Optional
 
-from backend.gpu_detector import GPUDetector, GPU
 from models.gpu_model import GPUModel
 from utils.logger import logger
+from utils.stylesheet import load_stylesheet
+import config
+
+if TYPE_CHECKING:
+    from backend.gpu_detector import GPU
+
+
+# List item role holding the pre-rendered details text of a GPU row
+_DETAILS_ROLE = Qt.UserRole + 1
+
+# Foreground brushes for list rows, shared by every item
+_BRUSH_OK = QBrush(QColor("#4CAF50"))  # Green: available for passthrough
+_BRUSH_PRIMARY = QBrush(QColor("#FF9800"))  # Orange: primary display GPU
+_BRUSH_DISABLED = QBrush(QColor("#9E9E9E"))  # Gray: unavailable
+_BRUSH_ERROR = QBrush(QColor("#F44336"))  # Red: errors
+
+
+class GPUDetectWorker(QThread):
+    """Worker thread for GPU detection (sysfs walk + pci.ids, lspci fallback)"""
+    detected = Signal(object) # GPUDetector, or None on failure
+    
+    def __init__(self, force_refresh: bool = False):
+        super().__init__()
+        self.force_refresh = force_refresh
+        
+    def run(self):
+        try:
+            from backend import gpu_detector_cache
+            if self.force_refresh:
+                self.detected.emit(gpu_detector_cache.refresh())
+            else:
+                self.detected.emit(gpu_detector_cache.get_detector())
+        except Exception as e:
+            logger.exception(f"Exception in GPUDetectWorker: {e}")
+            self.detected.emit(None)
 
 
 class GPUSelectionDialog(QDialog):
@@ -27,12 +63,15 @@ class GPUSelectionDialog(QDialog):
         self.setWindowTitle("Select GPU for Passthrough")
         self.setMinimumSize(700, 500)
         
-        # Initialize GPU detector
-        self.detector = GPUDetector()
-        self.selected_gpu: Optional[GPU] = None
+        # Shared GPU detector (scanned once per process, see Rescan),
+        # fetched on a worker thread so the dialog paints immediately
+        self.detector = None
+        self._passthrough_ids = set()
+        self.selected_gpu: Optional["GPU"] = None
+        self._detect_worker: Optional[GPUDetectWorker] = None
         
         self._setup_ui()
-        self._load_gpus()
+        self._start_detection()
     
     def _setup_ui(self):
         """Setup dialog UI"""
@@ -48,19 +87,10 @@ class GPUSelectionDialog(QDialog):
         self.status_group = QGroupBox("System Status")
         status_layout = QVBoxLayout(self.status_group)
         
-        iommu_status = "✓ Enabled" if self.detector.iommu_enabled else "✗ Disabled"
-        iommu_color = "#4CAF50" if self.detector.iommu_enabled else "#F44336"
-        
-        self.iommu_label = QLabel(f"IOMMU: {iommu_status}")
-        self.iommu_label.setStyleSheet(f"color: {iommu_color}; font-weight: bold;")
+        self.iommu_label = QLabel()
         status_layout.addWidget(self.iommu_label)
         
-        gpu_count = len(self.detector.gpus)
-        passthrough_count = len(self.detector.get_passthrough_gpus())
-        
-        self.gpu_count_label = QLabel(
-            f"Total GPUs: {gpu_count} | Available for passthrough: {passthrough_count}"
-        )
+        self.gpu_count_label = QLabel()
         status_layout.addWidget(self.gpu_count_label)
         
         layout.addWidget(self.status_group)
@@ -97,6 +127,10 @@ class GPUSelectionDialog(QDialog):
         cancel_btn = QPushButton("Cancel")
         cancel_btn.clicked.connect(self.reject)
         
+        self.rescan_btn = QPushButton("Rescan")
+        self.rescan_btn.clicked.connect(self._on_rescan)
+        
+        button_layout.addWidget(self.rescan_btn)
         button_layout.addStretch()
         button_layout.addWidget(cancel_btn)
         button_layout.addWidget(self.select_btn)
@@ -106,82 +140,110 @@ class GPUSelectionDialog(QDialog):
         # Apply dark theme
         self._apply_theme()
     
+    def _update_status(self):
+        """Show IOMMU state and GPU counts from the detector"""
+        iommu_status = "✓ Enabled" if self.detector.iommu_enabled else "✗ Disabled"
+        iommu_color = "#4CAF50" if self.detector.iommu_enabled else "#F44336"
+        
+        self.iommu_label.setText(f"IOMMU: {iommu_status}")
+        self.iommu_label.setStyleSheet(f"color: {iommu_color}; font-weight: bold;")
+        
+        gpu_count = len(self.detector.gpus)
+        passthrough_count = len(self._passthrough_ids)
+        
+        self.gpu_count_label.setText(
+            f"Total GPUs: {gpu_count} | Available for passthrough: {passthrough_count}"
+        )
+    
+    def _start_detection(self, force_refresh: bool = False):
+        """Detect GPUs in the background, showing a placeholder meanwhile"""
+        if self._detect_worker is not None:
+            return # Detection already running
+        
+        self.selected_gpu = None
+        self.select_btn.setEnabled(False)
+        self.rescan_btn.setEnabled(False)
+        self.details_text.clear()
+        self.iommu_label.setText("IOMMU: checking…")
+        self.gpu_count_label.setText("Scanning GPUs…")
+        self.gpu_list.clear()
+        self.gpu_list.addItem(QListWidgetItem("Scanning GPUs…"))
+        
+        self._detect_worker = GPUDetectWorker(force_refresh)
+        self._detect_worker.detected.connect(self._populate_gpus)
+        # The thread deletes itself, so it may outlive a closed dialog
+        self._detect_worker.finished.connect(self._detect_worker.deleteLater)
+        self._detect_worker.start()
+    
+    def _populate_gpus(self, detector):
+        """Fill the dialog from a finished detection"""
+        # detected is delivered before finished, so the worker still exists here
+        self._detect_worker = None
+        self.rescan_btn.setEnabled(True)
+        if detector is None:
+            self.gpu_list.clear()
+            item = QListWidgetItem("⚠ GPU detection failed - check logs")
+            item.setForeground(_BRUSH_ERROR)
+            self.gpu_list.addItem(item)
+            self.gpu_count_label.setText("")
+            return
+        
+        self.detector = detector
+        # Filter passthrough-capable GPUs once per detection; the status
+        # line and every list row read from this
+        self._passthrough_ids = {id(gpu) for gpu in detector.get_passthrough_gpus()}
+        self._update_status()
+        self._load_gpus()
+    
+    def _on_rescan(self):
+        """Re-detect GPUs, e.g. after changing driver bindings"""
+        self._start_detection(force_refresh=True)
+    
+    def done(self, result: int):
+        """Stop listening to a running detection; the worker cleans itself up"""
+        if self._detect_worker is not None:
+            self._detect_worker.detected.disconnect(self._populate_gpus)
+            self._detect_worker = None
+        super().done(result)
+    
     def _apply_theme(self):
         """Apply dark theme styling"""
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #1E1E1E;
-                color: #FFFFFF;
-            }
-            QGroupBox {
-                border: 2px solid #3E3E3E;
-                border-radius: 5px;
-                margin-top: 10px;
-                padding-top: 10px;
-                font-weight: bold;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                padding: 0 5px;
-            }
-            QListWidget {
-                background-color: #2B2B2B;
-                border: 1px solid #3E3E3E;
-                border-radius: 3px;
-            }
-            QListWidget::item {
-                padding: 10px;
-                border-bottom: 1px solid #3E3E3E;
-            }
-            QListWidget::item:selected {
-                background-color: #0D7377;
-            }
-            QTextEdit {
-                background-color: #2B2B2B;
-                border: 1px solid #3E3E3E;
-                border-radius: 3px;
-            }
-            QPushButton {
-                background-color: #0D7377;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                padding: 10px 20px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #14FFEC;
-                color: #1E1E1E;
-            }
-            QPushButton:disabled {
-                background-color: #3E3E3E;
-                color: #666666;
-            }
-        """)
+        self.setStyleSheet(load_stylesheet(config.STYLES_DIR / "dark_dialog.qss"))
     
     def _load_gpus(self):
         """Load detected GPUs into list"""
-        self.gpu_list.clear()
-        
+        # Insert all rows with updates and signals suspended, so the list
+        # lays out and repaints once instead of once per item
+        self.gpu_list.setUpdatesEnabled(False)
+        self.gpu_list.blockSignals(True)
+        try:
+            self.gpu_list.clear()
+            for item in self._build_gpu_items():
+                self.gpu_list.addItem(item)
+        finally:
+            self.gpu_list.blockSignals(False)
+            self.gpu_list.setUpdatesEnabled(True)
+    
+    def _build_gpu_items(self) -> List[QListWidgetItem]:
+        """Create the list items for the detected GPUs"""
         if not self.detector.iommu_enabled:
             item = QListWidgetItem("⚠ IOMMU not enabled - GPU passthrough unavailable")
-            item.setForeground(QColor("#F44336"))
-            self.gpu_list.addItem(item)
-            return
+            item.setForeground(_BRUSH_ERROR)
+            return [item]
         
         if len(self.detector.gpus) == 0:
-            item = QListWidgetItem("No GPUs detected")
-            self.gpu_list.addItem(item)
-            return
+            return [QListWidgetItem("No GPUs detected")]
         
-        for gpu in self.detector.gpus:
+        items = []
+        for index, gpu in enumerate(self.detector.sorted_gpus):
+            can_passthrough = id(gpu) in self._passthrough_ids
             gpu_model = GPUModel(
                 pci_address=gpu.pci_address,
                 vendor=gpu.vendor,
                 model=gpu.model,
                 iommu_group=gpu.iommu_group,
                 is_primary=gpu.is_primary,
-                can_passthrough=gpu.can_passthrough,
+                can_passthrough=can_passthrough,
                 driver=gpu.pci_device.driver or "None",
                 related_device_count=len(gpu.related_devices)
             )
@@ -191,45 +253,53 @@ class GPUSelectionDialog(QDialog):
                        f"   {gpu.pci_address} | IOMMU Group {gpu.iommu_group} | {gpu_model.status_text}"
             
             item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, gpu)  # Store GPU object
+            item.setData(Qt.UserRole, index)  # Index into detector.sorted_gpus
+            item.setData(_DETAILS_ROLE, self._format_gpu_details(gpu))
             
             # Color code based on availability
-            if gpu.can_passthrough:
-                item.setForeground(QColor("#4CAF50"))  # Green
-            elif gpu.is_primary:
-                item.setForeground(QColor("#FF9800"))  # Orange
+            if can_passthrough:
+                item.setForeground(_BRUSH_OK)
+            elif gpu_model.is_primary:
+                item.setForeground(_BRUSH_PRIMARY)
             else:
-                item.setForeground(QColor("#9E9E9E"))  # Gray
+                item.setForeground(_BRUSH_DISABLED)
             
-            if not gpu.can_passthrough:
+            if not can_passthrough:
                 item.setFlags(item.flags() & ~Qt.ItemIsEnabled)
             
-            self.gpu_list.addItem(item)
+            items.append(item)
+        
+        return items
+    
+    def _format_gpu_details(self, gpu: "GPU") -> str:
+        """Render the details pane text for a GPU"""
+        lines = [
+            f"GPU: {gpu.full_name}",
+            f"PCI Address: {gpu.pci_address}",
+            f"Vendor ID: {gpu.pci_device.vendor_id}:{gpu.pci_device.device_id}",
+            f"IOMMU Group: {gpu.iommu_group}",
+            f"Current Driver: {gpu.pci_device.driver or 'None'}",
+            f"Primary Display: {'Yes' if gpu.is_primary else 'No'}",
+            f"Can Passthrough: {'Yes' if gpu.can_passthrough else 'No'}",
+            f"\nRelated Devices ({len(gpu.related_devices)}):",
+        ]
+        lines.extend(f"  - {dev.device_name} ({dev.address})" for dev in gpu.related_devices)
+        return "\n".join(lines)
     
     def _on_gpu_selected(self, item: QListWidgetItem):
         """Handle GPU selection"""
-        gpu = item.data(Qt.UserRole)
+        index = item.data(Qt.UserRole)
         
-        if not isinstance(gpu, GPU):
+        # Placeholder/error rows carry no index
+        if not isinstance(index, int) or not 0 <= index < len(self.detector.sorted_gpus):
             return
         
+        gpu = self.detector.sorted_gpus[index]
         self.selected_gpu = gpu
         self.select_btn.setEnabled(gpu.can_passthrough)
         
-        # Show GPU details
-        details = f"GPU: {gpu.full_name}\n"
-        details += f"PCI Address: {gpu.pci_address}\n"
-        details += f"Vendor ID: {gpu.pci_device.vendor_id}:{gpu.pci_device.device_id}\n"
-        details += f"IOMMU Group: {gpu.iommu_group}\n"
-        details += f"Current Driver: {gpu.pci_device.driver or 'None'}\n"
-        details += f"Primary Display: {'Yes' if gpu.is_primary else 'No'}\n"
-        details += f"Can Passthrough: {'Yes' if gpu.can_passthrough else 'No'}\n"
-        details += f"\nRelated Devices ({len(gpu.related_devices)}):\n"
-        
-        for dev in gpu.related_devices:
-            details += f"  - {dev.device_name} ({dev.address})\n"
-        
-        self.details_text.setPlainText(details)
+        # Show GPU details (rendered when the list was loaded)
+        self.details_text.setPlainText(item.data(_DETAILS_ROLE))
     
     def _on_confirm(self):
         """Handle confirm button"""
@@ -261,6 +331,6 @@ class GPUSelectionDialog(QDialog):
         
         return "Unknown reason"
     
-    def get_selected_gpu(self) -> Optional[GPU]:
+    def get_selected_gpu(self) -> Optional["GPU"]:
         """Get the selected GPU"""
         return self.selected_gpu
@@ -7,20 +7,156 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
     QPushButton, QMessageBox, QFrame
 )
-from PySide6.QtCore import QProcess, Qt, QTimer
+from PySide6.QtCore import QProcess, QThread, Qt, Signal
 from utils.logger import logger
-import subprocess
+from utils.stylesheet import load_stylesheet
+import config
+import os
+import re
+import threading
 import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+
+# Printed between the command outputs of the batched virsh call
+_VIRSH_SEPARATOR = "virtflow-output-separator"
+
+# Looking Glass IVSHMEM device, with either quote style
+_LG_SHMEM_RE = re.compile(r"<shmem\s+name=[\"']looking-glass[\"']")
+
+# SPICE <graphics> element of a running domain's XML; port is only filled in
+# once QEMU has allocated it, listen may be absent
+_SPICE_GRAPHICS_RE = re.compile(
+    r"<graphics\s+type='spice'(?=[^>]*\bport='(\d+)')(?:(?=[^>]*\blisten='([^']+)'))?"
+)
+
+# IVSHMEM file shared with the guest's Looking Glass host
+_LG_SHM_PATH = '/dev/shm/looking-glass'
+
+# Looking Glass client options that never change: shared memory file, window
+# borders and controls for minimize/maximize/close
+_LG_STATIC_ARGS = (
+    '-f', _LG_SHM_PATH,
+    '-p', '0',
+    '-o', 'win:borderless=no',
+    '-o', 'win:minimize=yes',
+    '-o', 'win:maximize=yes',
+)
+
+# Seconds; a Looking Glass client exiting sooner is treated as a startup crash
+_LG_STARTUP_GRACE = 1.0
+
+# Every external binary the viewer may launch
+_VIEWER_BINARIES = ('looking-glass-client', 'remote-viewer', 'virt-viewer', 'spicy')
+
+# Info panel texts; {vm} is the VM name
+_INFO_WAITING = (
+    "🎮 VM Display\n\n"
+    "The VM viewer window should open separately.\n"
+    "You can view your VM there.\n\n"
+    "Close this window when done."
+)
+_INFO_LG_RUNNING = (
+    "✓ Looking Glass Viewer Launched\n\n"
+    "Viewing: {vm}\n\n"
+    "GPU-accelerated display with near-zero latency!\n\n"
+    "🖱️ MOUSE CONTROL (IMPORTANT!):\n"
+    "• Press ScrollLock to CAPTURE mouse\n"
+    "• Press ScrollLock again to RELEASE mouse\n"
+    "• DO NOT click window - use ScrollLock only!\n\n"
+    "⌨️ KEYBOARD:\n"
+    "• Ctrl+Alt+F: Toggle fullscreen\n"
+    "• Ctrl+Alt+Q: Quit viewer\n"
+    "• If stuck: Press ScrollLock to release!"
+)
+_INFO_SPICE_CONNECTED = (
+    "✓ SPICE Viewer Connected\n\n"
+    "Viewing: {vm}\n\n"
+    "The viewer window is open.\n"
+    "You can minimize this control window."
+)
+_INFO_VIEWER_CLOSED = (
+    "✕ Viewer Closed\n\n"
+    "The VM viewer was closed.\n"
+    "You can close this window now."
+)
+
+
+def _resolve_binaries(targets: Iterable[str]) -> Dict[str, str]:
+    """Find several binaries in one pass over PATH (name -> first executable found)"""
+    targets = set(targets)
+    found = {}
+    for directory in os.environ.get("PATH", "").split(os.pathsep):
+        try:
+            with os.scandir(directory or ".") as entries:
+                for entry in entries:
+                    if (entry.name in targets and entry.name not in found
+                            and entry.is_file() and os.access(entry.path, os.X_OK)):
+                        found[entry.name] = entry.path
+        except OSError:
+            continue
+    return found
+
+
+def _fetch_domxml(vm_name: str) -> Optional[str]:
+    """Get a domain's XML over the shared libvirt connection (None if unavailable)"""
+    try:
+        from backend.libvirt_pool import get_manager
+        
+        domain = get_manager().get_vm_by_name(vm_name)
+        return domain.XMLDesc(0) if domain is not None else None
+    except Exception as e:
+        logger.debug(f"libvirt unavailable for viewer, falling back to virsh: {e}")
+        return None
+
+
+@dataclass(frozen=True)
+class ViewerProbe:
+    """Results of the blocking lookups needed before a viewer launch"""
+    domxml: Optional[str]  # None if libvirt is unavailable
+    has_lg_client: bool
+    has_lg_shm: bool  # Shared memory file exists and we may open it read-write
+    spice_viewer: str
+
+
+class ViewerProbeWorker(QThread):
+    """Worker thread for the libvirt and filesystem lookups, so the UI never blocks"""
+    
+    probed = Signal(object)  # ViewerProbe
+    
+    def __init__(self, vm_name: str, parent=None):
+        super().__init__(parent)
+        self.vm_name = vm_name
+    
+    def run(self):
+        self.probed.emit(ViewerProbe(
+            domxml=_fetch_domxml(self.vm_name),
+            has_lg_client=IntegratedVMViewer._which('looking-glass-client') is not None,
+            # One access() call; the client opens the file O_RDWR
+            has_lg_shm=os.access(_LG_SHM_PATH, os.R_OK | os.W_OK),
+            spice_viewer=IntegratedVMViewer._find_viewer(),
+        ))
 
 
 class IntegratedVMViewer(QWidget):
     """Embedded VM viewer using remote-viewer"""
     
+    # Viewer binary name -> path, resolved once and shared by all viewers
+    _binaries: Optional[Dict[str, str]] = None
+    _binaries_lock = threading.Lock()  # Filled from probe worker threads
+    
     def __init__(self, vm_name: str, parent=None):
         super().__init__(parent)
         self.vm_name = vm_name
         self.viewer_process = None
         self.viewer_window_id = None
+        self._lg_started_at = 0.0  # time.monotonic() when the Looking Glass client started
+        self._domxml = None  # Domain XML, fetched once per viewer
+        self._display_uri = ""  # virsh domdisplay output (virsh fallback only)
+        self._probe: Optional[ViewerProbe] = None
+        self._probe_worker: Optional[ViewerProbeWorker] = None
+        self._closing = False  # Window closed; ignore late probe/virsh results
         
         self.setWindowTitle(f"VirtFlow - {vm_name}")
         self.resize(1280, 720)
@@ -71,12 +207,7 @@ class IntegratedVMViewer(QWidget):
         layout.addWidget(self.viewer_container)
         
         # Info label (shown when viewer not embedded)
-        self.info_label = QLabel(
-            "🎮 VM Display\n\n"
-            "The VM viewer window should open separately.\n"
-            "You can view your VM there.\n\n"
-            "Close this window when done."
-        )
+        self.info_label = QLabel(_INFO_WAITING)
         self.info_label.setAlignment(Qt.AlignCenter)
         self.info_label.setStyleSheet("color: #999; font-size: 14px;")
         
@@ -87,31 +218,85 @@ class IntegratedVMViewer(QWidget):
     
     def _apply_theme(self):
         """Apply dark theme"""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #1E1E1E;
-                color: #FFFFFF;
-            }
-            QFrame {
-                background-color: #2B2B2B;
-                border: 1px solid #3E3E3E;
-            }
-            QPushButton {
-                background-color: #0D7377;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 6px 12px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #14FFEC;
-                color: #1E1E1E;
-            }
-        """)
+        self.setStyleSheet(load_stylesheet(config.STYLES_DIR / "vm_viewer.qss"))
     
     def _connect_to_vm(self):
         """Connect to VM using Looking Glass or fallback to remote-viewer"""
+        # Lookups run on a worker thread; the launch continues in _on_probed
+        # No parent: the thread may outlive this widget and deletes itself
+        self._probe_worker = ViewerProbeWorker(self.vm_name)
+        self._probe_worker.probed.connect(self._on_probed)
+        self._probe_worker.finished.connect(self._probe_worker.deleteLater)
+        self._probe_worker.start()
+    
+    def _on_probed(self, probe: ViewerProbe):
+        """Launch a viewer with the worker's lookup results"""
+        # probed is delivered before finished, so the worker still exists here
+        self._probe_worker = None
+        if self._closing:
+            return
+        
+        self._probe = probe
+        if probe.domxml is not None:
+            self._domxml = probe.domxml
+            self._choose_viewer()
+            return
+        
+        # No libvirt bindings/connection - domain XML and display URI come from
+        # one virsh run, fed as a script on stdin; continues in _on_domain_info
+        import shlex
+        
+        name = shlex.quote(self.vm_name)
+        script = f"dumpxml {name}\necho {_VIRSH_SEPARATOR}\ndomdisplay {name}\n"
+        self._run_virsh(['-q'], self._on_domain_info, stdin=script)
+    
+    def _run_virsh(self, args: list, callback, stdin: str = None):
+        """
+        Run virsh without blocking the event loop
+        
+        Args:
+            args: virsh arguments
+            callback: Called with (ok, stdout) once virsh exits
+            stdin: Optional virsh shell script to run
+        """
+        process = QProcess(self)
+        
+        def on_finished(exit_code, exit_status):
+            output = bytes(process.readAllStandardOutput()).decode(errors='replace')
+            ok = exit_status == QProcess.NormalExit and exit_code == 0
+            if not ok:
+                error = bytes(process.readAllStandardError()).decode(errors='replace')
+                logger.error(f"virsh {' '.join(args)} failed: {error.strip()}")
+            process.deleteLater()
+            callback(ok, output)
+        
+        def on_error(error):
+            # Only FailedToStart means finished will never be emitted
+            if error == QProcess.FailedToStart:
+                logger.error(f"Failed to run virsh: {process.errorString()}")
+                process.deleteLater()
+                callback(False, "")
+        
+        process.finished.connect(on_finished)
+        process.errorOccurred.connect(on_error)
+        process.start('virsh', args)
+        if stdin is not None:
+            process.write(stdin.encode())
+            process.closeWriteChannel()
+    
+    def _on_domain_info(self, ok: bool, output: str):
+        """Pick the viewer once the domain XML is available"""
+        if self._closing:
+            return
+        
+        # domdisplay fails for a VM without a display, but the XML is still usable
+        xml, found, display = output.partition(_VIRSH_SEPARATOR)
+        self._domxml = xml if found else ""
+        self._display_uri = display.strip()
+        self._choose_viewer()
+    
+    def _choose_viewer(self):
+        """Launch Looking Glass if the VM has it, otherwise the SPICE viewer"""
         try:
             # Check if VM has Looking Glass configured
             has_looking_glass = self._check_looking_glass()
@@ -134,155 +319,166 @@ class IntegratedVMViewer(QWidget):
     
     def _check_looking_glass(self) -> bool:
         """Check if VM has Looking Glass IVSHMEM device"""
-        try:
-            result = subprocess.run(
-                ['virsh', 'dumpxml', self.vm_name],
-                capture_output=True,
-                text=True
-            )
-            return '<shmem name=\'looking-glass\'' in result.stdout
-        except:
-            return False
+        return _LG_SHMEM_RE.search(self._domxml) is not None
+    
+    def _get_spice_uri(self) -> str:
+        """Get the SPICE URI from the cached domain XML ("" if it has no port yet)"""
+        match = _SPICE_GRAPHICS_RE.search(self._domxml)
+        if not match:
+            return ""
+        
+        port, host = match.groups()
+        if not host or host in ('0.0.0.0', '::'):
+            host = '127.0.0.1'  # Listening on all addresses, connect locally
+        elif ':' in host:
+            host = f"[{host}]"  # IPv6 literal
+        return f"spice://{host}:{port}"
     
     def _launch_looking_glass(self):
         """Launch Looking Glass client"""
         try:
             # Check if Looking Glass client is installed
-            result = subprocess.run(['which', 'looking-glass-client'], capture_output=True)
-            
-            if result.returncode != 0:
-                self.status_label.setText("❌ Looking Glass not installed")
-                QMessageBox.warning(
-                    self,
+            if not self._probe.has_lg_client:
+                return self._lg_fail_fallback(
+                    "❌ Looking Glass not installed",
                     "Looking Glass Not Found",
                     "Looking Glass client is not installed.\n\n"
-                    "Click '📥 Install Looking Glass' button first.\n\n"
-                    "Falling back to SPICE viewer..."
+                    "Click '📥 Install Looking Glass' button first."
                 )
-                self._launch_spice_viewer()
-                return
             
             # Check if shared memory file exists
-            import os
-            if not os.path.exists('/dev/shm/looking-glass'):
-                self.status_label.setText("❌ Shared memory not found")
-                QMessageBox.warning(
-                    self,
+            if not self._probe.has_lg_shm:
+                return self._lg_fail_fallback(
+                    "❌ Shared memory not found",
                     "Shared Memory Missing",
-                    "Looking Glass shared memory file not found.\n\n"
-                    "Click 'Setup Looking Glass' button first.\n\n"
-                    "Falling back to SPICE viewer..."
+                    "Looking Glass shared memory file not found or not accessible.\n\n"
+                    "Click 'Setup Looking Glass' button first."
                 )
-                self._launch_spice_viewer()
-                return
             
             logger.info("Launching Looking Glass client...")
             
             # Get SPICE connection info for keyboard/mouse
-            spice_result = subprocess.run(
-                ['virsh', 'domdisplay', self.vm_name],
-                capture_output=True,
-                text=True
-            )
-            
-            spice_uri = spice_result.stdout.strip()
+            self._start_looking_glass(self._get_spice_uri() or self._display_uri)
+                
+        except Exception as e:
+            self._on_looking_glass_error(e)
+    
+    def _start_looking_glass(self, spice_uri: str):
+        """Start the Looking Glass client with the given SPICE URI for input"""
+        from urllib.parse import urlsplit
+        
+        try:
             logger.info(f"SPICE URI: {spice_uri}")
             
-            # Extract host and port from spice://127.0.0.1:5900
+            # Extract host and port from spice://127.0.0.1:5900 (or spice://[::1]:5900)
             # Looking Glass uses: spice:host=X,port=Y format
             spice_args = []
-            if spice_uri.startswith('spice://'):
-                spice_host_port = spice_uri.replace('spice://', '')
-                if ':' in spice_host_port:
-                    host, port = spice_host_port.split(':')
-                    # Correct format for Looking Glass
-                    spice_args = ['spice:host=' + host, 'spice:port=' + port]
-                    logger.info(f"Using SPICE: host={host}, port={port}")
-            
-            # Launch Looking Glass client using Popen (detached process)
-            # With window borders and controls for minimize/maximize/close
-            lg_args = [
-                'looking-glass-client',
-                '-f', '/dev/shm/looking-glass',
-                '-p', '0',
-                '-o', 'win:borderless=no',
-                '-o', 'win:minimize=yes',
-                '-o', 'win:maximize=yes'
-            ]
+            uri = urlsplit(spice_uri)
+            if uri.scheme == 'spice' and uri.hostname and uri.port:
+                spice_args = [f'spice:host={uri.hostname}', f'spice:port={uri.port}']
+                logger.info(f"Using SPICE: host={uri.hostname}, port={uri.port}")
             
             # Add SPICE connection if available
-            if spice_args:
-                lg_args.extend(spice_args)
-            
-            logger.info(f"Launching: {' '.join(lg_args)}")
-            self.viewer_process = subprocess.Popen(lg_args)
+            lg_args = [*_LG_STATIC_ARGS, *spice_args]
             
-            # Give it a moment to start
-            import time
-            time.sleep(1)
+            logger.info(f"Launching: looking-glass-client {' '.join(lg_args)}")
             
-            # Check if process is still running
-            if self.viewer_process.poll() is None:
-                self.status_label.setText("✓ Looking Glass Running")
-                self.info_label.setText(
-                    "✓ Looking Glass Viewer Launched\n\n"
-                    f"Viewing: {self.vm_name}\n\n"
-                    "GPU-accelerated display with near-zero latency!\n\n"
-                    "🖱️ MOUSE CONTROL (IMPORTANT!):\n"
-                    "• Press ScrollLock to CAPTURE mouse\n"
-                    "• Press ScrollLock again to RELEASE mouse\n"
-                    "• DO NOT click window - use ScrollLock only!\n\n"
-                    "⌨️ KEYBOARD:\n"
-                    "• Ctrl+Alt+F: Toggle fullscreen\n"
-                    "• Ctrl+Alt+Q: Quit viewer\n"
-                    "• If stuck: Press ScrollLock to release!"
-                )
-                logger.info(f"Looking Glass launched successfully for {self.vm_name}")
-            else:
-                # Process exited immediately - something wrong
-                self.status_label.setText("❌ Looking Glass crashed")
-                logger.error("Looking Glass process exited immediately")
-                
-                # Try to get error
-                QMessageBox.warning(
-                    self,
-                    "Looking Glass Failed",
-                    "Looking Glass client crashed on startup.\n\n"
-                    "Possible issues:\n"
-                    "• Looking Glass host not running in Windows\n"
-                    "• Shared memory file permissions\n"
-                    "• VM not configured correctly\n\n"
-                    "Falling back to SPICE viewer..."
-                )
-                self._launch_spice_viewer()
+            # Launch through QProcess: start, failure and exit all arrive as signals
+            self.viewer_process = QProcess(self)
+            self.viewer_process.setProgram('looking-glass-client')
+            self.viewer_process.setArguments(lg_args)
+            self.viewer_process.errorOccurred.connect(self._on_lg_error)
+            self.viewer_process.started.connect(self._on_lg_started)
+            self.viewer_process.finished.connect(self._on_lg_finished)
+            self.viewer_process.start()
                 
         except Exception as e:
-            logger.exception(f"Failed to launch Looking Glass: {e}")
-            self.status_label.setText("❌ Error launching Looking Glass")
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Failed to launch Looking Glass:\n{str(e)}\n\nFalling back to SPICE viewer..."
+            self._on_looking_glass_error(e)
+    
+    def _on_lg_started(self):
+        """Looking Glass client process is up"""
+        self._lg_started_at = time.monotonic()
+        self.status_label.setText("✓ Looking Glass Running")
+        self.info_label.setText(_INFO_LG_RUNNING.format(vm=self.vm_name))
+        logger.info(f"Looking Glass launched successfully for {self.vm_name}")
+    
+    def _on_lg_error(self, error):
+        """Fall back to SPICE if the Looking Glass client could not be started"""
+        # Other errors (e.g. Crashed) are followed by finished
+        if error == QProcess.FailedToStart:
+            self._on_looking_glass_error(
+                RuntimeError(self.viewer_process.errorString()), exc_info=False
             )
-            self._launch_spice_viewer()
+    
+    def _on_lg_finished(self, exit_code, exit_status):
+        """Handle the Looking Glass client exiting"""
+        if time.monotonic() - self._lg_started_at >= _LG_STARTUP_GRACE:
+            self._viewer_closed(exit_code, exit_status)
+            return
+        
+        # Process exited immediately - something wrong
+        logger.error("Looking Glass process exited immediately")
+        self._lg_fail_fallback(
+            "❌ Looking Glass crashed",
+            "Looking Glass Failed",
+            "Looking Glass client crashed on startup.\n\n"
+            "Possible issues:\n"
+            "• Looking Glass host not running in Windows\n"
+            "• Shared memory file permissions\n"
+            "• VM not configured correctly"
+        )
+    
+    def _on_looking_glass_error(self, e: Exception, exc_info: bool = True):
+        """
+        Report a Looking Glass launch error and fall back to SPICE
+        
+        Args:
+            e: The error
+            exc_info: Log the traceback (only valid when called from an except block)
+        """
+        logger.error(f"Failed to launch Looking Glass: {e}", exc_info=exc_info)
+        self._lg_fail_fallback(
+            "❌ Error launching Looking Glass",
+            "Error",
+            f"Failed to launch Looking Glass:\n{str(e)}",
+            QMessageBox.critical
+        )
+    
+    def _lg_fail_fallback(self, status: str, title: str, body: str, notify=QMessageBox.warning):
+        """
+        Tell the user why Looking Glass can't be used and open the SPICE viewer instead
+        
+        Args:
+            status: Toolbar status text
+            title: Message box title
+            body: Message box text, without the fallback notice
+            notify: QMessageBox.warning or QMessageBox.critical
+        """
+        self.status_label.setText(status)
+        notify(self, title, f"{body}\n\nFalling back to SPICE viewer...")
+        self._launch_spice_viewer()
     
     def _launch_spice_viewer(self):
         """Launch SPICE viewer (fallback)"""
+        display_uri = self._display_uri or self._get_spice_uri()
+        if display_uri:
+            self._start_spice_viewer(True, display_uri)
+            return
+        
+        # Get SPICE connection info; the viewer is started in _start_spice_viewer
+        self._run_virsh(['domdisplay', self.vm_name], self._start_spice_viewer)
+    
+    def _start_spice_viewer(self, ok: bool, output: str):
+        """Start remote-viewer/virt-viewer once the display URI is known"""
+        if self._closing:
+            return
+        
         try:
-            # Get SPICE connection info
-            result = subprocess.run(
-                ['virsh', 'domdisplay', self.vm_name],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            if result.returncode != 0:
+            if not ok:
                 self.status_label.setText("❌ Failed to get display info")
-                logger.error(f"Failed to get display info: {result.stderr}")
                 return
             
-            display_uri = result.stdout.strip()
+            display_uri = output.strip()
             if not display_uri:
                 self.status_label.setText("❌ No display available")
                 logger.error("No display URI available")
@@ -292,10 +488,12 @@ class IntegratedVMViewer(QWidget):
             
             # Launch remote-viewer
             self.viewer_process = QProcess(self)
+            self.viewer_process.started.connect(self._on_spice_started)
+            self.viewer_process.errorOccurred.connect(self._on_spice_error)
             self.viewer_process.finished.connect(self._viewer_closed)
             
             # Try remote-viewer first, fallback to virt-viewer
-            viewer_cmd = self._find_viewer()
+            viewer_cmd = self._probe.spice_viewer
             
             if viewer_cmd == 'remote-viewer':
                 self.viewer_process.start('remote-viewer', [
@@ -308,29 +506,38 @@ class IntegratedVMViewer(QWidget):
                     '--wait',
                     self.vm_name
                 ])
-            
-            if self.viewer_process.waitForStarted(3000):
-                self.status_label.setText("✓ SPICE Connected")
-                self.info_label.setText(
-                    "✓ SPICE Viewer Connected\n\n"
-                    f"Viewing: {self.vm_name}\n\n"
-                    "The viewer window is open.\n"
-                    "You can minimize this control window."
-                )
-                logger.info(f"SPICE viewer launched for {self.vm_name}")
-            else:
-                self.status_label.setText("❌ Viewer failed to start")
-                logger.error("Viewer process failed to start")
+            # Status is updated by _on_spice_started / _on_spice_error
                 
         except Exception as e:
             logger.exception(f"Failed to launch SPICE viewer: {e}")
             self.status_label.setText("❌ Connection error")
     
-    def _find_viewer(self):
+    def _on_spice_started(self):
+        """SPICE viewer process is up"""
+        self.status_label.setText("✓ SPICE Connected")
+        self.info_label.setText(_INFO_SPICE_CONNECTED.format(vm=self.vm_name))
+        logger.info(f"SPICE viewer launched for {self.vm_name}")
+    
+    def _on_spice_error(self, error):
+        """Report a SPICE viewer that could not be started"""
+        # Other errors (e.g. Crashed) are followed by finished
+        if error == QProcess.FailedToStart:
+            self.status_label.setText("❌ Viewer failed to start")
+            logger.error(f"Viewer process failed to start: {self.viewer_process.errorString()}")
+    
+    @classmethod
+    def _which(cls, binary: str) -> Optional[str]:
+        """Get the path of a viewer binary (None if not installed)"""
+        with cls._binaries_lock:
+            if cls._binaries is None:
+                cls._binaries = _resolve_binaries(_VIEWER_BINARIES)
+            return cls._binaries.get(binary)
+    
+    @classmethod
+    def _find_viewer(cls) -> str:
         """Find available SPICE viewer"""
         for viewer in ['remote-viewer', 'virt-viewer', 'spicy']:
-            result = subprocess.run(['which', viewer], capture_output=True)
-            if result.returncode == 0:
+            if cls._which(viewer):
                 return viewer
         return 'virt-viewer'  # Default fallback
     
@@ -347,25 +554,12 @@ class IntegratedVMViewer(QWidget):
         """Handle viewer process closed"""
         logger.info(f"Viewer closed with code: {exit_code}")
         self.status_label.setText("✕ Viewer closed")
-        self.info_label.setText(
-            "✕ Viewer Closed\n\n"
-            "The VM viewer was closed.\n"
-            "You can close this window now."
-        )
+        self.info_label.setText(_INFO_VIEWER_CLOSED)
     
     def closeEvent(self, event):
         """Handle window close"""
-        # Check if viewer process is running (handle both QProcess and Popen)
-        is_running = False
-        if self.viewer_process:
-            if hasattr(self.viewer_process, 'state'):
-                # QProcess
-                is_running = self.viewer_process.state() == QProcess.Running
-            elif hasattr(self.viewer_process, 'poll'):
-                # subprocess.Popen
-                is_running = self.viewer_process.poll() is None
-        
-        if is_running:
+        # Check if viewer process is running (Looking Glass or SPICE, both QProcess)
+        if self.viewer_process and self.viewer_process.state() != QProcess.NotRunning:
             reply = QMessageBox.question(
                 self,
                 "Close Viewer?",
@@ -373,21 +567,21 @@ class IntegratedVMViewer(QWidget):
                 QMessageBox.Yes | QMessageBox.No
             )
             
-            if reply == QMessageBox.Yes:
-                # Kill process (handle both QProcess and Popen)
-                if hasattr(self.viewer_process, 'kill'):
-                    self.viewer_process.kill()
-                    if hasattr(self.viewer_process, 'waitForFinished'):
-                        # QProcess
-                        self.viewer_process.waitForFinished(1000)
-                    elif hasattr(self.viewer_process, 'wait'):
-                        # subprocess.Popen
-                        try:
-                            self.viewer_process.wait(timeout=1)
-                        except:
-                            pass
-                event.accept()
-            else:
+            if reply != QMessageBox.Yes:
                 event.ignore()
-        else:
-            event.accept()
+                return
+            
+            # We are closing on purpose - skip the exit/crash handlers
+            self.viewer_process.finished.disconnect()
+            self.viewer_process.kill()
+            self.viewer_process.waitForFinished(1000)
+        
+        # Results already queued by the probe thread or a virsh run are still
+        # delivered after this point; the flag makes their handlers no-ops
+        self._closing = True
+        if self._probe_worker is not None:
+            # The worker finishes on its own and deletes itself
+            self._probe_worker.probed.disconnect(self._on_probed)
+            self._probe_worker = None
+        
+        event.accept()
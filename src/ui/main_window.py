@@ -87,6 +87,9 @@ class MainWindow(QMainWindow):
         # Initialize UI
         self._setup_ui()
         
+        # Disabled until main.py's background requirement checks report back
+        self.sidebar.new_vm_btn.setEnabled(False)
+        
         # --- NEW: Add resizers ---
         self._add_resizers()
         
@@ -250,6 +253,14 @@ class MainWindow(QMainWindow):
         # After closing, refresh sidebar in case settings changed
         self.sidebar.refresh_vm_list()
 
+    @Slot(bool, str)
+    def on_requirements_checked(self, success: bool, error_msg: str):
+        """Enable VM creation once the background system checks have passed."""
+        self.sidebar.new_vm_btn.setEnabled(success)
+        if not success:
+            self.sidebar.new_vm_btn.setToolTip(error_msg)
+            logger.warning(f"System requirements not met: {error_msg}")
+
     def _on_create_vm(self):
         """Handle Create VM button click"""
         from ui.create_vm_wizard import CreateVMWizard
@@ -16,11 +16,12 @@ from PySide6.QtGui import QIcon, QAction, QCursor, QColor
 from ui.widgets.vm_list_item_widget import VMListItemWidget
 from ui.widgets.icon_utils import create_recolored_icon
 
-from backend.libvirt_manager import LibvirtManager
+from backend.libvirt_pool import get_manager
 from backend.vm_controller import VMController, VMState
 # --- TASK 1.4: Import GuestDriverHelper ---
 from backend.guest_driver_helper import GuestDriverHelper
 from models.vm_model import VMModel
+from models.vm_stats import compute_rates
 from utils.logger import logger
 import config
 import time
@@ -57,7 +58,7 @@ class SidebarWidget(QFrame):
         self.setFixedWidth(288) # w-72
         
         # --- Backend ---
-        self.manager = LibvirtManager()
+        self.manager = get_manager()
         self.controller = VMController(self.manager)
         # --- TASK 1.4: Instantiate helper ---
         self.guest_helper = GuestDriverHelper(self.manager)
@@ -158,7 +159,8 @@ class SidebarWidget(QFrame):
                 
                 if list_item:
                     widget = self.vm_list.itemWidget(list_item)
-                    if widget:
+                    # Same instance means libvirt reported no changes
+                    if widget and widget.vm is not vm:
                         widget.update_data(vm)
                 else:
                     self._add_vm_to_list(vm)
@@ -174,6 +176,7 @@ class SidebarWidget(QFrame):
                 self.vm_list.takeItem(self.vm_list.row(item))
 
             self.vm_data = new_vm_data
+            VMModel.prune_cache(refreshed_uuids)
             
             if current_uuid:
                 self._select_item_by_uuid(current_uuid)
@@ -236,24 +239,13 @@ class SidebarWidget(QFrame):
         # Calculate stats
         stats = {}
         if vm.state == VMState.RUNNING:
-            current_time = time.time()
+            current_time = time.monotonic()
             if uuid in self.prev_stats:
                 time_delta = current_time - self.prev_time.get(uuid, current_time)
-                if time_delta > 0:
-                    stats['disk_read'] = (vm.disk_read_bytes - self.prev_stats[uuid]['disk_read_bytes']) / time_delta
-                    stats['disk_write'] = (vm.disk_write_bytes - self.prev_stats[uuid]['disk_write_bytes']) / time_delta
-                    stats['net_rx'] = (vm.net_rx_bytes - self.prev_stats[uuid]['net_rx_bytes']) / time_delta
-                    stats['net_tx'] = (vm.net_tx_bytes - self.prev_stats[uuid]['net_tx_bytes']) / time_delta
-
-            stats = {k: max(0, v) for k, v in stats.items()} # Clamp negatives
+                stats = compute_rates(self.prev_stats[uuid], vm, time_delta)
             
-            # Store current stats for next calculation
-            self.prev_stats[uuid] = {
-                'disk_read_bytes': vm.disk_read_bytes,
-                'disk_write_bytes': vm.disk_write_bytes,
-                'net_rx_bytes': vm.net_rx_bytes,
-                'net_tx_bytes': vm.net_tx_bytes
-            }
+            # Keep this (immutable) snapshot for the next calculation
+            self.prev_stats[uuid] = vm
             self.prev_time[uuid] = current_time
         else:
              # Clear old stats if VM is off
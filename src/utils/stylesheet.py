@@ -0,0 +1,120 @@
+"""
+QSS stylesheet loading for VirtFlow
+
+Stylesheets are minified (comments and redundant whitespace stripped) and
+the result is cached under config.CACHE_DIR, keyed by the source file's
+mtime, so later launches read the small pre-processed copy instead of
+re-processing the source. Within a process each stylesheet is only read
+once; widgets that load the same file share the resulting string.
+"""
+
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, Tuple
+from utils.logger import logger
+import config
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_PUNCT_SPACE_RE = re.compile(r'\s*([{};])\s*')
+# Comments, and quoted strings (font names, url("...")) which are copied
+# through unchanged. Matched together so quotes inside a comment are ignored.
+_TOKEN_RE = re.compile(
+    r'/\*.*?\*/|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'', re.DOTALL
+)
+
+# Stylesheets already loaded by this process, keyed by (path, source mtime)
+_loaded: Dict[Tuple[Path, int], str] = {}
+
+
+def minify_qss(qss: str) -> str:
+    """Strip comments and whitespace that Qt's QSS parser would skip anyway"""
+    parts = []
+    unquoted = []
+    pos = 0
+    for match in _TOKEN_RE.finditer(qss):
+        unquoted.append(qss[pos:match.start()])
+        pos = match.end()
+        token = match.group()
+        if token.startswith('/*'):
+            continue
+        parts.append(_minify_unquoted(''.join(unquoted)))
+        parts.append(token)
+        unquoted = []
+    unquoted.append(qss[pos:])
+    parts.append(_minify_unquoted(''.join(unquoted)))
+    return ''.join(parts).strip()
+
+
+def _minify_unquoted(qss: str) -> str:
+    """Collapse whitespace in a stretch of QSS with no strings or comments"""
+    qss = _WHITESPACE_RE.sub(' ', qss)
+    return _PUNCT_SPACE_RE.sub(r'\1', qss)
+
+
+def load_stylesheet(path: Path) -> str:
+    """
+    Load a QSS file, preferring the cached minified copy
+
+    Args:
+        path: Source .qss file
+
+    Returns:
+        Stylesheet text, or "" if the file cannot be read
+    """
+    path = Path(path)
+    try:
+        source_mtime = path.stat().st_mtime_ns
+    except OSError:
+        logger.warning(f"Could not load QSS file: {path}")
+        return ""
+
+    key = (path, source_mtime)
+    qss = _loaded.get(key)
+    if qss is None:
+        qss = _read_stylesheet(path, source_mtime)
+        if qss:
+            _loaded[key] = qss
+    return qss
+
+
+def _read_stylesheet(path: Path, source_mtime: int) -> str:
+    """Read the cached minified copy of a QSS file, creating it if needed"""
+    cache_path = config.CACHE_DIR / f"{path.stem}.{source_mtime}.min.qss"
+    try:
+        cached = cache_path.read_text(encoding="utf-8")
+        # An empty copy is a leftover of a failed write, not a stylesheet
+        if cached:
+            return cached
+    except OSError:
+        pass
+
+    try:
+        qss = minify_qss(path.read_text(encoding="utf-8"))
+    except OSError:
+        logger.warning(f"Could not load QSS file: {path}")
+        return ""
+
+    try:
+        config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Drop copies made from older versions of this stylesheet
+        for stale in config.CACHE_DIR.glob(f"{path.stem}.*.min.qss"):
+            stale.unlink(missing_ok=True)
+        # Write to a temporary file and rename it into place, so a
+        # concurrent launch never reads a half-written copy
+        fd, tmp_name = tempfile.mkstemp(
+            dir=config.CACHE_DIR, prefix=f".{path.stem}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+                tmp.write(qss)
+            os.replace(tmp_name, cache_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+    except OSError as e:
+        logger.debug(f"Failed to cache stylesheet {path.name}: {e}")
+
+    return qss